@@ -0,0 +1,78 @@
+"""
+Serialization cost of the KPI figures: the page of `plotly.offline.plot`, plotly's JSON encoder and the direct `figure_json`.
+
+    python -m benchmarks.figure_json_benchmark --classes 100 300 1000
+"""
+
+import argparse
+import base64
+import json
+from functools import partial
+
+import numpy as np
+import pandas as pd
+import plotly
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from benchmarks.table_model_benchmark import measure
+from src.backend.controllers.figure_controller import FigureTemplate, PlotStyle, figure_json
+from src.backend.controllers.kpi_controller import REGISTRY_VALUES
+
+
+def kpi_table(classes: int) -> pd.DataFrame:
+    """KPI table of the registry with `classes` classes and numeric shares."""
+    rng = np.random.default_rng(0)
+    shares = rng.dirichlet([1, 1, 1], classes)
+    return pd.DataFrame(
+        {"Кол-во систем": rng.integers(1, 1000, classes), **{name: shares[:, i] for i, name in enumerate(REGISTRY_VALUES)}},
+        index=[f"Класс информационных систем {i}" for i in range(classes)],
+    )
+
+
+def offline_div(figure: dict) -> str:
+    """The page body as it was built before the persistent plot pages."""
+    return plotly.offline.plot(go.Figure(figure), include_plotlyjs=False, auto_open=False, output_type="div")
+
+
+def plotly_json(figure: dict) -> str:
+    return pio.to_json(go.Figure(figure, _validate=False), validate=False)
+
+
+def decode_typed_arrays(value: object) -> object:
+    """Figure JSON with the typed-array buffers replaced by lists, as plotly.js reads them."""
+    if isinstance(value, dict):
+        if set(value) == {"dtype", "bdata"}:
+            return np.frombuffer(base64.b64decode(value["bdata"]), dtype="<" + value["dtype"]).tolist()
+        return {key: decode_typed_arrays(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [decode_typed_arrays(item) for item in value]
+    return value
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--classes", type=int, nargs="+", default=[100, 300, 1000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    template = FigureTemplate(PlotStyle.for_kpi("registry"))
+    print(f"best of {args.repeat}, ms (KB)")  # noqa: T201
+    print(f"{'classes':<10}{'offline div':>18}{'plotly json':>18}{'figure_json':>18}")  # noqa: T201
+    for classes in args.classes:
+        table = kpi_table(classes)
+        figure, _ = template.figure_dict(table, pd.Series(data=True, index=table.index))
+        if decode_typed_arrays(json.loads(figure_json(figure))) != json.loads(plotly_json(figure)):
+            message = f"figure_json differs from plotly's JSON for {classes} classes"
+            raise AssertionError(message)
+
+        row = f"{classes:<10}"
+        for serialize in [offline_div, plotly_json, figure_json]:
+            elapsed = measure(partial(serialize, figure), args.repeat)
+            size = len(serialize(figure).encode()) / 1024
+            row += f"{elapsed:>10.1f} ({size:>5.0f})"
+        print(row)  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+Regression check of the incremental KPI counts: random sequences of single-value toggles of the toolbar filters
+(including a filter toggled back to all values) applied to `IncrementalCounts`, compared after every step
+with a full recompute (`KpiCube.counts_table`) and with the tables of the original row-filtering implementation.
+
+    python -m benchmarks.incremental_counts_check --steps 500
+    python -m benchmarks.incremental_counts_check --workbook path/to/workbook.xlsx
+
+Exits with a non-zero status on the first mismatch.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.backend.controllers.dashboard_controller import parse_data_sheet0
+from src.backend.controllers.kpi_controller import (
+    CLASS_COLUMN,
+    EXISTANCE_VALUES,
+    FILTER_COLUMNS,
+    IMPORT_COLUMN,
+    KPI_METRICS,
+    LANDSCAPE_COLUMN,
+    REGISTRY_COLUMN,
+    REGISTRY_VALUES,
+    STAGE_COLUMN,
+    STATUS_COLUMN,
+    KpiAggregator,
+    kpi_table,
+    move_empty_class_first,
+)
+
+
+def filter_data(
+    data_df: pd.DataFrame,
+    status: list[str] | None = None,
+    stage: list[str] | None = None,
+    landscape: list[str] | None = None,
+    import_type: list[str] | None = None,
+) -> pd.DataFrame:
+    """Rows matching the toolbar filters, like before the KPI cubes."""
+    if status is not None:
+        data_df = data_df[data_df[STATUS_COLUMN].isin(status)]
+    if stage is not None:
+        data_df = data_df[data_df[STAGE_COLUMN].isin(stage)]
+    if landscape is not None:
+        data_df = data_df[data_df[LANDSCAPE_COLUMN].isin(landscape)]
+    if import_type is not None:
+        data_df = data_df[data_df[IMPORT_COLUMN].isin(import_type)]
+    return data_df
+
+
+def registry_kpi(data_df: pd.DataFrame, *filters: list[str] | None) -> pd.DataFrame | None:
+    """Table of the registry KPI computed from the filtered rows, like before the fused aggregation."""
+    if data_df.empty:
+        return None
+    data_df = filter_data(data_df, *filters)
+
+    if data_df.empty:
+        return pd.DataFrame(columns=REGISTRY_VALUES)
+
+    data = data_df[[CLASS_COLUMN, REGISTRY_COLUMN]].melt(id_vars=CLASS_COLUMN).fillna({"value": -1}).groupby([CLASS_COLUMN, "value"])
+    data = data.size()
+    data = data.groupby(level=0).transform(lambda x: x / x.sum())
+    data = data.unstack()  # noqa: PD010
+    data = data.rename_axis(index=None, columns=None)
+    for code in [0.0, 1.0, -1.0]:
+        if code not in data.columns:
+            data[code] = 0
+    data = data[[0.0, 1.0, -1.0]]
+    data = data.rename(columns={-1.0: "(пусто)", 0.0: "Нет в реестре", 1.0: "Есть в реестре"})
+    data = data.fillna(0)
+
+    data["Кол-во систем"] = data_df.groupby(CLASS_COLUMN).size()
+    return move_empty_class_first(data)
+
+
+def existance_kpi(data_df: pd.DataFrame, existance_column_name: str, *filters: list[str] | None) -> pd.DataFrame | None:
+    """Table of an import substitution KPI computed from the filtered rows, like before the fused aggregation."""
+    if data_df.empty:
+        return None
+    data_df = filter_data(data_df, *filters)
+
+    if data_df.empty:
+        return pd.DataFrame(columns=EXISTANCE_VALUES)
+
+    data = data_df[[CLASS_COLUMN, existance_column_name]].melt(id_vars=CLASS_COLUMN).fillna({"value": "(пусто)"})
+    data["value"] = data["value"].replace({"разработка": "в разработке", "минус": "нет", "?": "(пусто)"})
+
+    data = data.groupby([CLASS_COLUMN, "value"])
+    data = data.size()
+    data = data.groupby(level=0).transform(lambda x: x / x.sum())
+    data = data.unstack()  # noqa: PD010
+    data = data.rename_axis(index=None, columns=None)
+    cols = ["нет", "да", "в разработке", "не используют", "(пусто)"]
+    for col in cols:
+        if col not in data.columns:
+            data[col] = 0
+    data = data[cols]
+    data = data.rename(columns={"да": "Да", "нет": "Нет", "в разработке": "В разработке", "не используют": "Не используется"})
+    data = data.fillna(0)
+
+    data["Кол-во систем"] = data_df.groupby(CLASS_COLUMN).size()
+    return move_empty_class_first(data)
+
+
+def baseline_table(data_df: pd.DataFrame, name: str, selections: list[list[str] | None]) -> pd.DataFrame | None:
+    if name == "registry":
+        return registry_kpi(data_df, *selections)
+    return existance_kpi(data_df, KPI_METRICS[name]["column"], *selections)
+
+
+def synthetic_data(rows: int, seed: int) -> pd.DataFrame:
+    """Dataset with a few categories per filter, missing values and values unknown to the KPI mappings."""
+    rng = np.random.default_rng(seed)
+    existance_raw = np.array(["да", "нет", "разработка", "в разработке", "минус", "не используют", "?", "(пусто)", "другое", None], dtype=object)
+    data = {
+        CLASS_COLUMN: rng.choice([f"Класс {i}" for i in range(12)] + ["(пусто)"], rows),
+        STATUS_COLUMN: rng.choice(["Целевая", "Нецелевая", "Вывод", "(пусто)"], rows),
+        STAGE_COLUMN: rng.choice(["Эксплуатация", "Разработка", "Вывод", "Пилот", "(пусто)"], rows),
+        LANDSCAPE_COLUMN: rng.choice(["Пром", "Тест", "(пусто)"], rows),
+        IMPORT_COLUMN: rng.choice(["Да", "Нет", "(пусто)"], rows),
+        REGISTRY_COLUMN: rng.choice(np.array([0, 1, 2, np.nan]), rows),
+    }
+    for name in ["OS", "virtualization", "DBMS"]:
+        data[KPI_METRICS[name]["column"]] = rng.choice(existance_raw, rows)
+    return pd.DataFrame(data)
+
+
+def toggle(selections: list[list[str] | None], categories: list[list[str]], rng: np.random.Generator) -> list[list[str] | None]:
+    """Selections with one value of one filter toggled, or (sometimes) one filter set back to all values."""
+    selections = list(selections)
+    axis = int(rng.integers(len(categories)))
+    current = selections[axis]
+    if current is not None and rng.random() < 0.15:  # noqa: PLR2004
+        selections[axis] = None
+        return selections
+    selected = set(categories[axis] if current is None else current)
+    selected ^= {categories[axis][rng.integers(len(categories[axis]))]}
+    selections[axis] = [category for category in categories[axis] if category in selected]
+    return selections
+
+
+def check(data_df: pd.DataFrame, steps: int, seed: int) -> int:
+    """Applies the toggles to every KPI, returns 1 at the first mismatch and 0 if all tables match."""
+    aggregator = KpiAggregator(data_df)
+    if aggregator.index is None:
+        return 0
+    categories = [list(aggregator.index.categories[column]) for column in FILTER_COLUMNS]
+    rng = np.random.default_rng(seed)
+    selections: list[list[str] | None] = [None] * len(FILTER_COLUMNS)
+
+    for step in range(steps):
+        selections = toggle(selections, categories, rng)
+        for name, counter in aggregator.counters.items():
+            counts = counter.update(selections)
+            try:
+                pd.testing.assert_frame_equal(counts, aggregator.cubes[name].counts_table(selections))
+                pd.testing.assert_frame_equal(
+                    kpi_table(counts, counter.cube.values),
+                    baseline_table(data_df, name, selections),
+                    check_dtype=False,
+                    check_index_type=False,
+                    check_column_type=False,
+                )
+            except AssertionError as e:
+                print(f"step {step}, KPI {name}, selections {selections}:\n{e}", file=sys.stderr)  # noqa: T201
+                return 1
+
+    updates = aggregator.update_stats()
+    print(f"{steps} steps, {updates['delta_updates']} delta and {updates['full_updates']} full updates: OK")  # noqa: T201
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workbook", type=Path, help="workbook to check on, synthetic data otherwise")
+    parser.add_argument("--rows", type=int, default=5000, help="number of systems of the synthetic data")
+    parser.add_argument("--steps", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    data_df = parse_data_sheet0(args.workbook) if args.workbook is not None else synthetic_data(args.rows, args.seed)
+    sys.exit(check(data_df, args.steps, args.seed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Repaint cost of the KPI table model: display strings cached per column vs. `iloc` lookups on every `data()` call.
+
+    python -m benchmarks.table_model_benchmark --rows 10000
+"""
+
+import argparse
+import os
+import time
+from collections.abc import Callable
+from functools import partial
+from typing import Any
+
+import numpy as np
+import pandas as pd
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, Qt, QVariant
+from PyQt6.QtWidgets import QApplication
+
+from src.backend.controllers.kpi_controller import REGISTRY_VALUES
+from src.ui.widgets.pandas_table import CheckableTableView, PandasTableModel
+from src.utils.config import AppConfig
+
+
+class IlocTableModel(PandasTableModel):
+    """Model answering `data()` from the dataframe like before the display cache."""
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if role == Qt.ItemDataRole.DisplayRole and index.isValid():
+            if index.column() == 1:
+                return QVariant(str(self._dataframe.index[index.row()]))
+            if index.column() > 1:
+                value = self._dataframe.iloc[index.row(), index.column() - 2]
+                # Shares stay numeric, `PercentDelegate` formats them
+                return QVariant(value if self.is_percent_column(index.column()) else str(value))
+        return super().data(index, role)  # type: ignore[no-untyped-call]
+
+
+def kpi_frame(rows: int) -> pd.DataFrame:
+    """KPI table like the one of the registry tab (numeric shares), with `rows` classes."""
+    rng = np.random.default_rng(0)
+    shares = rng.dirichlet([1, 1, 1], rows)
+    return pd.DataFrame(
+        {"Кол-во систем": rng.integers(1, 1000, rows), **{name: shares[:, i] for i, name in enumerate(REGISTRY_VALUES)}},
+        index=[f"Класс {i}" for i in range(rows)],
+    )
+
+
+def measure(function: Callable[[], object], repeat: int) -> float:
+    """Best time of the function in milliseconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+
+def read_all(model: QAbstractTableModel) -> None:
+    """Requests the display data of every cell, as a full repaint with `ResizeToContents` columns does."""
+    root = QModelIndex()
+    for column in range(model.columnCount()):
+        for row in range(model.rowCount()):
+            model.data(model.index(row, column, root), Qt.ItemDataRole.DisplayRole)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    app = QApplication([])
+    AppConfig.register_param("font_size", 12)
+    data = kpi_frame(args.rows)
+    view = CheckableTableView()
+    view.resize(800, 600)
+
+    print(f"{args.rows} rows, best of {args.repeat}, ms")  # noqa: T201
+    print(f"{'model':<10}{'build':>10}{'all cells':>12}{'view':>10}")  # noqa: T201
+    for name, model_class in [("iloc", IlocTableModel), ("cached", PandasTableModel)]:
+        build = measure(partial(model_class, data, "Класс ИС ИМЗ", REGISTRY_VALUES), args.repeat)
+        model = model_class(data, "Класс ИС ИМЗ", REGISTRY_VALUES)
+        cells = measure(partial(read_all, model), args.repeat)
+
+        def show(model: PandasTableModel = model) -> None:
+            # Sets the model with the column widths of the tab and renders the visible part
+            view.setModel(None)
+            view.setModel(model)
+            for i in range(model.columnCount()):
+                view.setItemDelegateForColumn(i, view.percent_delegate if model.is_percent_column(i) else None)
+            view.resizeColumnsToContents()
+            view.grab()
+
+        repaint = measure(show, args.repeat)
+        print(f"{name:<10}{build:>10.1f}{cells:>12.1f}{repaint:>10.1f}")  # noqa: T201
+
+    app.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@ from PyQt6.QtCore import QTimer
 from PyQt6.QtWidgets import QApplication
 
 from src.ui.main_window import MainWindow
+from src.ui.widgets.plot_page import register_plot_scheme
 from src.ui.widgets.settings_window import ColorWidget, FileWidget, NumberWidget
 from src.utils.config import AppConfig
 
@@ -192,6 +193,33 @@ def initialize_params() -> None:
         require_reload=True,
     )
 
+    AppConfig.register_param(
+        "cache_max_size",
+        500,
+        label="Размер кэша данных (МБ)",
+        group="Дополнительное",
+        tooltip="Максимальный размер кэша обработанных файлов с данными в мегабайтах",
+        edit_widget=NumberWidget,
+    )
+
+    AppConfig.register_param(
+        "filter_debounce_interval",
+        300,
+        label="Задержка применения фильтров (мс)",
+        group="Дополнительное",
+        tooltip="Изменения фильтров, сделанные быстрее этой задержки, применяются вместе одним обновлением",
+        edit_widget=NumberWidget,
+    )
+
+    AppConfig.register_param(
+        "aggregation_cache_size",
+        64,
+        label="Размер кэша расчётов",
+        group="Дополнительное",
+        tooltip="Максимальное количество сохранённых таблиц и графиков для ранее выбранных фильтров",
+        edit_widget=NumberWidget,
+    )
+
     # Plot dimensions
     AppConfig.register_param(
         "plot_min_width",
@@ -267,6 +295,8 @@ def run() -> int:
     signal.signal(signal.SIGINT, sigint_handler)
 
     initialize_params()
+    # Custom schemes have to be known to WebEngine before the application starts
+    register_plot_scheme()
     app: QApplication = QApplication(sys.argv)
     timer = QTimer()
     timer.start(1000)  # run every second
@@ -0,0 +1,115 @@
+"""
+Command-line KPI computation without Qt, e.g. for scheduled jobs on servers without a display.
+
+    python -m src.backend kpi "Системы.xlsx" --status "Целевая" --format csv --output reports/
+    python -m src.backend batch "branches/*.xlsx" --output reports/
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from src.backend.controllers.batch_controller import SUMMARY_ERROR_COLUMN, SUMMARY_FILE_COLUMN, collect_workbooks, run_batch
+from src.backend.controllers.kpi_controller import KPI_METRICS
+from src.backend.controllers.report_controller import (
+    OUTPUT_FORMATS,
+    compute_kpi_tables,
+    kpi_table_to_csv,
+    kpi_tables_to_json,
+    plain_error_message,
+    write_kpi_tables,
+)
+from src.backend.models.data_cache import DataCache
+
+
+def add_filter_arguments(parser: argparse.ArgumentParser) -> None:
+    filters = parser.add_argument_group("фильтры", "каждый фильтр можно указать несколько раз, без фильтра выбираются все значения")
+    filters.add_argument("--status", action="append", metavar="VALUE", help="Статус принадлежности к целевой архитектуре")
+    filters.add_argument("--stage", action="append", metavar="VALUE", help="Этап ЖЦ")
+    filters.add_argument("--landscape", action="append", metavar="VALUE", help="ИТ-ландшафт")
+    filters.add_argument("--import-type", action="append", metavar="VALUE", help="Целевая ИС для задач импортозамещения")
+
+
+def create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m src.backend", description="Расчёт КПЭ по выгрузке систем без графического интерфейса")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    kpi = commands.add_parser("kpi", help="таблицы КПЭ по классам ИС для одного файла")
+    kpi.add_argument("workbook", type=Path, help="файл .xlsx с листом Sheet0")
+    kpi.add_argument("--kpi", action="append", choices=list(KPI_METRICS), help="КПЭ для расчёта (по умолчанию все)")
+    kpi.add_argument("--format", choices=OUTPUT_FORMATS, default="csv", help="формат результата (по умолчанию csv)")
+    kpi.add_argument("--output", type=Path, help="папка для результатов (по умолчанию вывод в stdout)")
+    kpi.add_argument("--cache-dir", type=Path, help="папка кэша разобранных файлов")
+    add_filter_arguments(kpi)
+
+    batch = commands.add_parser("batch", help="таблицы КПЭ, графики и сводка для нескольких файлов")
+    batch.add_argument("workbooks", nargs="+", help="папки с файлами .xlsx или шаблоны путей (например, 'exports/*.xlsx')")
+    batch.add_argument("--output", type=Path, required=True, help="папка для результатов, по подпапке на каждый файл")
+    batch.add_argument("--format", choices=OUTPUT_FORMATS, default="csv", help="формат таблиц и сводки (по умолчанию csv)")
+    batch.add_argument("--workers", type=int, help="количество процессов (по умолчанию по числу ядер)")
+    batch.add_argument("--no-charts", action="store_true", help="не сохранять графики PNG")
+    batch.add_argument("--width", type=int, default=1920, help="ширина графиков в пикселях")
+    batch.add_argument("--height", type=int, default=1080, help="высота графиков в пикселях")
+    add_filter_arguments(batch)
+
+    return parser
+
+
+def run_kpi(args: argparse.Namespace) -> int:
+    cache = DataCache(args.cache_dir) if args.cache_dir is not None else None
+    tables = compute_kpi_tables(args.workbook, args.status, args.stage, args.landscape, args.import_type, kpi_names=args.kpi, cache=cache)
+
+    if args.output is not None:
+        for file_path in write_kpi_tables(tables, args.output, args.format):
+            sys.stderr.write(f"{file_path}\n")
+    elif args.format == "json":
+        sys.stdout.write(kpi_tables_to_json(tables) + "\n")
+    else:
+        sys.stdout.write("\n".join(f"# {name}\n{kpi_table_to_csv(table)}" for name, table in tables.items()))
+    return 0
+
+
+def run_batch_command(args: argparse.Namespace) -> int:
+    files = collect_workbooks(args.workbooks)
+    if not files:
+        sys.stderr.write("Ошибка: файлы .xlsx не найдены\n")
+        return 1
+
+    finished = 0
+
+    def on_done(row: dict) -> None:
+        nonlocal finished
+        finished += 1
+        error = row[SUMMARY_ERROR_COLUMN]
+        sys.stderr.write(f"[{finished}/{len(files)}] {row[SUMMARY_FILE_COLUMN]}: {'ошибка: ' + error if error else 'готово'}\n")
+
+    filters = (args.status, args.stage, args.landscape, args.import_type)
+    summary = run_batch(
+        files,
+        args.output,
+        filters,
+        output_format=args.format,
+        charts=not args.no_charts,
+        width=args.width,
+        height=args.height,
+        workers=args.workers,
+        on_done=on_done,
+    )
+    failed = int((summary[SUMMARY_ERROR_COLUMN] != "").sum())
+    sys.stderr.write(f"Обработано файлов: {len(files) - failed} из {len(files)}\n")
+    return 1 if failed else 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = create_parser().parse_args(argv)
+    try:
+        if args.command == "batch":
+            return run_batch_command(args)
+        return run_kpi(args)
+    except (OSError, ValueError, KeyError) as e:
+        sys.stderr.write(f"Ошибка: {plain_error_message(e)}\n")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+import glob
+import os
+from collections.abc import Callable
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import pandas as pd
+
+from src.backend.controllers.figure_controller import PlotStyle, build_figure
+from src.backend.controllers.kpi_controller import COUNT_COLUMN, KPI_METRICS
+from src.backend.controllers.report_controller import compute_kpi_tables, plain_error_message, write_kpi_tables
+
+SUMMARY_FILE_COLUMN: str = "Файл"
+SUMMARY_ERROR_COLUMN: str = "Ошибка"
+
+
+def collect_workbooks(patterns: list[str]) -> list[Path]:
+    """Workbooks of the directories (all `.xlsx` files in them) and glob patterns, without duplicates and Excel lock files."""
+    files: list[Path] = []
+    for pattern in patterns:
+        directory = Path(pattern)
+        matches = sorted(directory.glob("*.xlsx")) if directory.is_dir() else sorted(Path(match) for match in glob.glob(pattern, recursive=True))  # noqa: PTH207
+        files.extend(match.resolve() for match in matches if match.is_file() and not match.name.startswith("~$"))
+    return list(dict.fromkeys(files))
+
+
+def output_dirs(files: list[Path], output_dir: Path) -> list[Path]:
+    """Output directory of every workbook named after its file, numbered if several workbooks have the same name."""
+    dirs: list[Path] = []
+    used: set[str] = set()
+    for file_path in files:
+        name = file_path.stem
+        number = 1
+        while name.casefold() in used:
+            number += 1
+            name = f"{file_path.stem}_{number}"
+        used.add(name.casefold())
+        dirs.append(output_dir / name)
+    return dirs
+
+
+def kpi_overall_shares(table: pd.DataFrame, values: list[str]) -> dict[str, float]:
+    """Shares of the KPI values over all systems of the table."""
+    system_count = table[COUNT_COLUMN].sum() if COUNT_COLUMN in table else 0
+    if system_count == 0:
+        return dict.fromkeys(values, float("nan"))
+    return (table[values].mul(table[COUNT_COLUMN], axis=0).sum() / system_count).to_dict()
+
+
+def process_workbook(
+    file_path: Path,
+    output_dir: Path,
+    filters: tuple[list[str] | None, ...] = (None, None, None, None),
+    output_format: str = "csv",
+    charts: bool = True,  # noqa: FBT001, FBT002
+    width: int = 1920,
+    height: int = 1080,
+) -> dict:
+    """
+    Writes the KPI tables and the charts of the workbook to the directory and returns its row of the summary.
+    Never raises: the error of a bad workbook is reported in the summary row.
+    """
+    summary: dict = {SUMMARY_FILE_COLUMN: str(file_path), SUMMARY_ERROR_COLUMN: ""}
+    try:
+        status, stage, landscape, import_type = filters
+        tables = compute_kpi_tables(file_path, status, stage, landscape, import_type)
+        write_kpi_tables(tables, output_dir, output_format)
+
+        summary[COUNT_COLUMN] = int(tables["registry"].get(COUNT_COLUMN, pd.Series(dtype=int)).sum())
+        for name, table in tables.items():
+            values = KPI_METRICS[name]["values"]
+            summary.update({f"{name}: {value}": share for value, share in kpi_overall_shares(table, values).items()})
+
+        if charts:
+            for name, table in tables.items():
+                fig, _ = build_figure(table, pd.Series(data=True, index=table.index), PlotStyle.for_kpi(name), width=width, height=height)
+                fig.write_image(output_dir / f"{name}.png", format="png")
+
+    except Exception as e:  # noqa: BLE001
+        summary[SUMMARY_ERROR_COLUMN] = plain_error_message(e) or type(e).__name__
+
+    return summary
+
+
+def run_batch(
+    files: list[Path],
+    output_dir: Path,
+    filters: tuple[list[str] | None, ...] = (None, None, None, None),
+    output_format: str = "csv",
+    charts: bool = True,  # noqa: FBT001, FBT002
+    width: int = 1920,
+    height: int = 1080,
+    workers: int | None = None,
+    on_done: Callable[[dict], None] | None = None,
+) -> pd.DataFrame:
+    """
+    Processes the workbooks in a process pool (see `process_workbook`) and writes the combined summary to the output directory.
+    `on_done` is called with the summary row of every workbook as soon as it is finished. Returns the summary in the order of the files.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    rows: dict[int, dict] = {}
+    workers = workers or min(len(files), os.cpu_count() or 1) or 1
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures: dict[Future, int] = {
+            executor.submit(process_workbook, file_path, workbook_dir, filters, output_format, charts, width, height): i
+            for i, (file_path, workbook_dir) in enumerate(zip(files, output_dirs(files, output_dir), strict=True))
+        }
+        for future in as_completed(futures):
+            i = futures[future]
+            try:
+                row = future.result()
+            except Exception as e:  # noqa: BLE001
+                # The worker process itself failed (e.g. ran out of memory)
+                row = {SUMMARY_FILE_COLUMN: str(files[i]), SUMMARY_ERROR_COLUMN: plain_error_message(e) or type(e).__name__}
+            rows[i] = row
+            if on_done is not None:
+                on_done(row)
+
+    summary = pd.DataFrame([rows[i] for i in range(len(files))], columns=summary_columns())
+    summary[COUNT_COLUMN] = summary[COUNT_COLUMN].astype("Int64")
+    write_summary(summary, output_dir, output_format)
+    return summary
+
+
+def summary_columns() -> list[str]:
+    columns = [SUMMARY_FILE_COLUMN, SUMMARY_ERROR_COLUMN, COUNT_COLUMN]
+    for name, metric in KPI_METRICS.items():
+        columns.extend(f"{name}: {value}" for value in metric["values"])
+    return columns
+
+
+def write_summary(summary: pd.DataFrame, output_dir: Path, output_format: str) -> Path:
+    if output_format == "json":
+        file_path = output_dir / "summary.json"
+        summary.to_json(file_path, orient="records", force_ascii=False, indent=2)
+    else:
+        file_path = output_dir / "summary.csv"
+        summary.to_csv(file_path, index=False, encoding="utf-8-sig")
+    return file_path
@@ -1,25 +1,146 @@
+from collections.abc import Callable
+from contextlib import suppress
 from pathlib import Path
 
+import numpy as np
+import openpyxl
 import pandas as pd
+from openpyxl.cell.cell import ERROR_CODES
 
+from src.backend.models.data_cache import DataCache
+
+# Strings treated as missing values by pandas.read_excel by default
+NA_STRINGS: frozenset[str] = frozenset(
+    [
+        "",
+        "#N/A",
+        "#N/A N/A",
+        "#NA",
+        "-1.#IND",
+        "-1.#QNAN",
+        "-NaN",
+        "-nan",
+        "1.#IND",
+        "1.#QNAN",
+        "<NA>",
+        "N/A",
+        "NA",
+        "NULL",
+        "NaN",
+        "None",
+        "n/a",
+        "nan",
+        "null",
+    ]
+)
 
-def parse_data(file_path: Path, columns_list: list, sheet_name: str = "Sheet0") -> pd.DataFrame:
-    required_columns = [col.strip().lower() for col in columns_list]
 
-    data = pd.read_excel(file_path, sheet_name=sheet_name)
+class LoadCancelledError(Exception):
+    """Raised when loading of the data was cancelled by the user."""
 
-    current_columns = data.columns.str.strip().str.lower()
 
-    missing_columns = [col for col in required_columns if col not in current_columns]
-    extra_columns = [data.columns[index] for index, col in enumerate(current_columns) if col not in required_columns]
+def check_columns(columns: list[str], required_columns: list[str]) -> None:
+    missing_columns = [col for col in required_columns if col not in columns]
 
     if missing_columns:
         column_list = "".join([f'<li>"{col}"</li>' for col in missing_columns])
         msg = f"<b>Необходимые столбцы отсутствуют:</b><ul>{column_list}</ul>"
         raise ValueError(msg)
 
-    data = data.drop(columns=extra_columns)
-    data.columns = [col.strip() for col in data.columns]
+
+def read_excel_columns(
+    file_path: Path, required_columns: list[str], sheet_name: str = "Sheet0", is_cancelled: Callable[[], bool] | None = None
+) -> pd.DataFrame:
+    """
+    Reads only the required columns of the sheet.
+
+    The header row is read first and matched against `required_columns` (stripped and lowercased),
+    then the rows are streamed in openpyxl read-only mode and only the matched columns are stored into preallocated arrays,
+    so memory depends on the number of required columns, not on the width of the sheet.
+    Trailing rows are dropped like `pandas.read_excel` does: only while none of their cells (in any column) holds a value.
+    `is_cancelled` is polled while reading, LoadCancelledError is raised when it returns True.
+    """
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        if sheet_name not in workbook.sheetnames:
+            raise ValueError(f"Лист {sheet_name} не найден")
+        sheet = workbook[sheet_name]
+
+        header = next(sheet.iter_rows(min_row=1, max_row=1, values_only=True), ())
+        header_names = [str(col).strip() if col is not None else "" for col in header]
+        check_columns([col.lower() for col in header_names], required_columns)
+
+        # Position of the first occurrence of every required column
+        positions: dict[str, int] = {}
+        seen: set[str] = set()
+        for position, name in enumerate(header_names):
+            if name.lower() in required_columns and name.lower() not in seen:
+                seen.add(name.lower())
+                positions[name] = position
+        offsets = list(positions.values())
+
+        # Dimensions from the sheet are only a hint, the arrays grow if the hint is wrong
+        capacity = max((sheet.max_row or 0) - 1, 1024)
+        columns = [np.empty(capacity, dtype=object) for _ in positions]
+        last_filled_row = 0
+        # Whole rows are read (read-only mode parses them anyway), the other columns count for the trailing rows
+        rows = sheet.iter_rows(min_row=2, values_only=True)
+        for row_count, row in enumerate(rows):
+            if is_cancelled is not None and row_count % 1000 == 0 and is_cancelled():
+                raise LoadCancelledError
+            if row_count == capacity:
+                capacity *= 2
+                columns = [np.resize(column, capacity) for column in columns]
+            # Same rule as pandas.read_excel: a cell holds a value unless it is blank or an empty string
+            filled = False
+            for column, offset in zip(columns, offsets, strict=True):
+                value = row[offset] if offset < len(row) else None
+                if value is not None and value != "":
+                    filled = True
+                if value is None or (isinstance(value, str) and (value in NA_STRINGS or value in ERROR_CODES)):
+                    value = np.nan
+                column[row_count] = value
+            if filled or any(value is not None and value != "" for value in row):
+                last_filled_row = row_count + 1
+    finally:
+        workbook.close()
+
+    # Trailing empty rows are dropped the same way pandas.read_excel does
+    data = pd.DataFrame({name: column[:last_filled_row] for name, column in zip(positions, columns, strict=True)}).infer_objects()
+
+    # Numbers stored as text are converted like pandas.read_excel does
+    for col in data.columns:
+        if not pd.api.types.is_numeric_dtype(data[col]) and not pd.api.types.is_datetime64_any_dtype(data[col]):
+            with suppress(ValueError, TypeError):
+                data[col] = pd.to_numeric(data[col])
+    return data
+
+
+def parse_data(
+    file_path: Path,
+    columns_list: list,
+    sheet_name: str = "Sheet0",
+    streaming: bool = True,  # noqa: FBT001, FBT002
+    is_cancelled: Callable[[], bool] | None = None,
+) -> pd.DataFrame:
+    """
+    Parses the sheet and keeps only the columns from `columns_list`.
+    With `streaming` only the required columns are read from the workbook,
+    otherwise the whole sheet is read with pandas and the extra columns are dropped.
+    """
+    required_columns = [col.strip().lower() for col in columns_list]
+
+    if streaming:
+        data = read_excel_columns(file_path, required_columns, sheet_name=sheet_name, is_cancelled=is_cancelled)
+    else:
+        data = pd.read_excel(file_path, sheet_name=sheet_name)
+
+        current_columns = data.columns.str.strip().str.lower()
+        check_columns(list(current_columns), required_columns)
+
+        extra_columns = [data.columns[index] for index, col in enumerate(current_columns) if col not in required_columns]
+        data = data.drop(columns=extra_columns)
+        data.columns = [col.strip() for col in data.columns]
 
     return data.fillna(
         {
@@ -32,29 +153,55 @@ def parse_data(file_path: Path, columns_list: list, sheet_name: str = "Sheet0")
     )
 
 
-def parse_data_sheet0(file_path: Path) -> pd.DataFrame:
-    head_list = [
-        "дата ввода в эксплуатацию",
-        "ит-ландшафт / наименование",
-        "инвентарный номер",
-        "класс ис имз / наименование",
-        "кпэ по классу в 2024",
-        "краткое наименование",
-        "наименование",
-        "план импортозамещения",
-        "бюджет",
-        "наличие в реестре мин связи российского по",
-        "описание",
-        "наличие имз ос",
-        "наличие имз субд",
-        "наличие имз виртуализации",
-        "ответственный за развитие / фио",
-        "приказ о вводе в эксплуатацию",
-        "статус принадлежности к целевой архитектуре / наименование",
-        "технический владелец / фио",
-        "этап жц / наименование",
-        "код класса",
-        "целевая ис для задач импортозамещения",
-    ]
+SHEET0_COLUMNS: list[str] = [
+    "дата ввода в эксплуатацию",
+    "ит-ландшафт / наименование",
+    "инвентарный номер",
+    "класс ис имз / наименование",
+    "кпэ по классу в 2024",
+    "краткое наименование",
+    "наименование",
+    "план импортозамещения",
+    "бюджет",
+    "наличие в реестре мин связи российского по",
+    "описание",
+    "наличие имз ос",
+    "наличие имз субд",
+    "наличие имз виртуализации",
+    "ответственный за развитие / фио",
+    "приказ о вводе в эксплуатацию",
+    "статус принадлежности к целевой архитектуре / наименование",
+    "технический владелец / фио",
+    "этап жц / наименование",
+    "код класса",
+    "целевая ис для задач импортозамещения",
+]
+
+
+def parse_data_sheet0(file_path: Path, is_cancelled: Callable[[], bool] | None = None) -> pd.DataFrame:
+    return parse_data(file_path=file_path, columns_list=SHEET0_COLUMNS, sheet_name="Sheet0", is_cancelled=is_cancelled)
+
+
+def load_data_sheet0(
+    file_path: Path,
+    cache: DataCache | None = None,
+    force_reparse: bool = False,  # noqa: FBT001, FBT002
+    is_cancelled: Callable[[], bool] | None = None,
+) -> pd.DataFrame:
+    """
+    Loads the parsed Sheet0 of the workbook from the cache if the workbook didn't change,
+    otherwise parses the workbook and stores the result in the cache.
+    """
+    if cache is None:
+        return parse_data_sheet0(file_path, is_cancelled=is_cancelled)
+
+    file_path = Path(file_path)
+    key = cache.make_key(file_path, schema="Sheet0:" + ";".join(SHEET0_COLUMNS))
+    if not force_reparse:
+        data = cache.load(key)
+        if data is not None:
+            return data
 
-    return parse_data(file_path=file_path, columns_list=head_list, sheet_name="Sheet0")
+    data = parse_data_sheet0(file_path, is_cancelled=is_cancelled)
+    cache.store(key, data)
+    return data
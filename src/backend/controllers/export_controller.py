@@ -0,0 +1,91 @@
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+import pandas as pd
+import plotly.io as pio
+
+from src.backend.controllers.figure_controller import figure_hash, figure_json
+from src.backend.controllers.report_controller import kpi_table_to_csv
+from src.backend.models.lru_cache import LruCache
+
+# Number of rendered images kept by `ImageExporter`
+IMAGE_CACHE_SIZE: int = 16
+
+
+class ImageExporter:
+    """
+    PNG rendering of figure dicts by one Kaleido process, started by `warm_up` and kept alive for the session.
+
+    Kaleido renders one image at a time (its process is shared by all threads behind a lock), so the callers
+    prepare the figures concurrently and only the rendering is serialized. Rendered images are cached
+    by the hash of the figure: exporting an unchanged chart again only writes the file.
+    """
+
+    def __init__(self, cache_size: int = IMAGE_CACHE_SIZE) -> None:
+        self.images = LruCache(cache_size)
+
+    def warm_up(self) -> None:
+        """Starts the Kaleido process, the first image costs about a second otherwise."""
+        self.render({"data": [], "layout": {}})
+
+    def render(self, figure: dict) -> bytes:
+        key = figure_hash(figure_json(figure))
+        image = self.images.get(key)
+        if image is None:
+            image = pio.to_image(figure, format="png", validate=False, engine="kaleido")
+            self.images.put(key, image)
+        return image
+
+    def export(self, figure: dict, file_path: Path) -> Path:
+        file_path.write_bytes(self.render(figure))
+        return file_path
+
+
+class ExportTask:
+    """Files of one chart of the batch export: the PNG of the figure and, if given, the CSV of the table."""
+
+    def __init__(self, name: str, make_figure: Callable[[], dict], table: pd.DataFrame | None = None) -> None:
+        self.name = name
+        self.make_figure = make_figure
+        self.table = table
+
+    def file_count(self) -> int:
+        return 1 if self.table is None else 2
+
+
+def export_all(
+    tasks: list[ExportTask],
+    output_dir: Path,
+    exporter: ImageExporter,
+    on_done: Callable[[Path], None] | None = None,
+    workers: int | None = None,
+) -> list[Path]:
+    """
+    Writes `<name>.png` of every task (and `<name>.csv` of its table) to the directory, the files are prepared concurrently
+    in a thread pool. `on_done` is called with every file as soon as it is written. Returns the files in the order of the tasks.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    def write_image(task: ExportTask) -> Path:
+        return exporter.export(task.make_figure(), output_dir / f"{task.name}.png")
+
+    def write_table(task: ExportTask, table: pd.DataFrame) -> Path:
+        file_path = output_dir / f"{task.name}.csv"
+        # BOM, so that Excel detects the encoding
+        file_path.write_text(kpi_table_to_csv(table), encoding="utf-8-sig")
+        return file_path
+
+    files: dict[int, Path] = {}
+    with ThreadPoolExecutor(max_workers=workers or sum(task.file_count() for task in tasks) or 1) as executor:
+        futures: dict[Future, int] = {}
+        for task in tasks:
+            futures[executor.submit(write_image, task)] = len(futures)
+            if task.table is not None:
+                futures[executor.submit(write_table, task, task.table)] = len(futures)
+        for future in as_completed(futures):
+            files[futures[future]] = future.result()
+            if on_done is not None:
+                on_done(files[futures[future]])
+
+    return [files[i] for i in range(len(files))]
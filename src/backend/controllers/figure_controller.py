@@ -0,0 +1,302 @@
+import base64
+import hashlib
+import json
+from typing import Any
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from src.backend.controllers.kpi_controller import EXISTANCE_VALUES, REGISTRY_VALUES
+from src.backend.models.lru_cache import LruCache
+
+# Texts of the plot of every KPI
+KPI_PLOT_TEXTS: dict[str, dict[str, str]] = {
+    "registry": {
+        "title_template": "Выполнение КПЭ по классам",
+        "singular_title_template": 'Выполнение КПЭ по классу "{x}"',
+        "legend_title": "Наличие в реестре",
+    },
+    **{
+        name: {
+            "title_template": f"{title} по классам",
+            "singular_title_template": f'{title} по классу "{{x}}"',
+            "legend_title": "Наличие имз",
+        }
+        for name, title in [("OS", "Наличие имз ОС"), ("virtualization", "Наличие имз Виртуализации"), ("DBMS", "Наличие имз СУБД")]
+    },
+}
+
+# Default colors of the plots (see the plot colors in the settings)
+RED_COLOR: str = "rgba(220, 20, 60, 255)"
+GREEN_COLOR: str = "rgba(0, 176, 80, 255)"
+GRAY_COLOR: str = "rgba(200, 200, 200, 255)"
+ORANGE_COLOR: str = "rgba(255, 140, 0, 255)"
+DARK_GRAY_COLOR: str = "rgba(100, 100, 100, 255)"
+
+# Range of the integer arrays written as int32 typed arrays by `FigureEncoder`, other integer arrays are written as lists
+TYPED_INT_MIN: int = -(2**31)
+TYPED_INT_MAX: int = 2**31 - 1
+
+
+class PlotStyle:
+    """Everything affecting the look of a KPI figure, independent of any widget."""
+
+    def __init__(
+        self,
+        colors: list[str] | None = None,
+        tick_font_size: int = 15,
+        legend_font_size: int = 12,
+        title_font_size: int = 18,
+        hover_font_size: int = 16,
+        text_info_font_size: int = 12,
+        title_template: str = "Выполнение КПЭ по классам",
+        x_axis_title: str = "Классы",
+        y_axis_title: str = "Процент",
+        column_names: list[str] | None = None,
+        truncate_len: int = 30,
+        singular_title_template: str = 'Выполнение КПЭ по классу "{x}"',
+        legend_title: str = "Наличие в реестре",
+        margins: dict[str, int] | None = None,
+        background_color: str = "rgba(0,0,0,0)",
+    ) -> None:
+        self.colors: list[str] = colors or ["rgb(220, 20, 60)", "rgb(34, 139, 34)", "rgb(200, 200, 200)"]
+        self.tick_font_size = tick_font_size
+        self.legend_font_size = legend_font_size
+        self.title_font_size = title_font_size
+        self.hover_font_size = hover_font_size
+        self.text_info_font_size = text_info_font_size
+        self.title_template = title_template
+        self.x_axis_title = x_axis_title
+        self.y_axis_title = y_axis_title
+        self.column_names: list[str] = column_names or ["Нет в реестре", "Есть в реестре", "(пусто)"]
+        self.truncate_len = truncate_len
+        self.singular_title_template = singular_title_template
+        self.legend_title = legend_title
+        self.margins: dict[str, int] = margins or {"l": 40, "r": 40, "t": 40, "b": 120}
+        self.background_color = background_color
+
+    @classmethod
+    def for_kpi(cls, name: str, **kwargs) -> "PlotStyle":
+        """Style of the KPI plot with the default colors, `kwargs` override any property."""
+        if name == "registry":
+            defaults = {"colors": [RED_COLOR, GREEN_COLOR, GRAY_COLOR], "column_names": REGISTRY_VALUES}
+        else:
+            defaults = {"colors": [RED_COLOR, GREEN_COLOR, ORANGE_COLOR, DARK_GRAY_COLOR, GRAY_COLOR], "column_names": EXISTANCE_VALUES}
+        return cls(**{**defaults, **KPI_PLOT_TEXTS[name], **kwargs})
+
+    def key(self) -> tuple:
+        """Hashable form of the style, e.g. for cache keys."""
+        return (
+            tuple(self.colors),
+            self.tick_font_size,
+            self.legend_font_size,
+            self.title_font_size,
+            self.hover_font_size,
+            self.text_info_font_size,
+            self.title_template,
+            self.singular_title_template,
+            self.x_axis_title,
+            self.y_axis_title,
+            self.truncate_len,
+            self.legend_title,
+            tuple(self.margins.items()),
+            self.background_color,
+            tuple(self.column_names),
+        )
+
+
+def percent_labels(values: np.ndarray, decimals: int = 0) -> np.ndarray:
+    """Labels of the shares as `f"{x:.{decimals}%}"` formats them, built for the whole array at once."""
+    values = np.asarray(values, dtype=float)
+    # Whole percents are rounded in numpy, like `%` formatting does (half to even), the other precisions are formatted by numpy
+    labels = np.rint(np.nan_to_num(values) * 100).astype(np.int64).astype(str) if decimals == 0 else np.char.mod(f"%.{decimals}f", values * 100)
+    return np.where(np.isnan(values), "nan%", np.char.add(labels, "%"))
+
+
+def truncate_labels(labels: pd.Index, max_len: int) -> np.ndarray:
+    """Labels cut to `max_len` characters, with an ellipsis if cut."""
+    labels = labels.astype(str)
+    return np.where(labels.str.len() > max_len, labels.str[:max_len] + "...", labels)
+
+
+class FigureTemplate:
+    """
+    Skeletons of the figures of one style: the bar chart, the pie chart and the "no data" placeholder.
+
+    Styling goes through the plotly validators once, when the template is built. A figure is then the skeleton
+    with the data arrays swapped in, as a plain dict (see `figure_json`). Templates and their figures are never
+    modified, so they can be shared between threads; a style change means a new template.
+    """
+
+    def __init__(self, style: PlotStyle) -> None:
+        self.style = style
+
+        empty = go.Figure()
+        empty.add_annotation(text="Нет данных", xref="paper", yref="paper", x=0.5, y=0.5, showarrow=False, font={"size": 20}, align="center")
+        empty.update_layout(
+            showlegend=False,
+            xaxis={"showgrid": False, "showticklabels": False, "zeroline": False},
+            yaxis={"showgrid": False, "showticklabels": False, "zeroline": False},
+            margin=style.margins,
+            plot_bgcolor=style.background_color,
+        )
+        self.empty: dict = empty.to_plotly_json()
+
+        pie = go.Figure(
+            go.Pie(
+                textinfo="label+text",
+                hoverinfo="label+text",
+                textfont={"size": style.tick_font_size},
+                hoverlabel={"font": {"size": style.hover_font_size}},
+            )
+        )
+        pie.update_layout(
+            title_font_size=style.title_font_size,
+            showlegend=True,
+            legend={"title": style.legend_title, "font": {"size": style.legend_font_size}},
+            margin=style.margins,
+            plot_bgcolor=style.background_color,
+        )
+        self.pie: dict = pie.to_plotly_json()
+
+        bar = go.Figure()
+        for idx, name in enumerate(style.column_names):
+            bar.add_trace(
+                go.Bar(
+                    name=name,
+                    marker_color=style.colors[idx],
+                    hovertemplate="%{customdata}<br>" + name + ": %{text}<extra></extra>",
+                    hoverlabel={"font": {"size": style.hover_font_size}},
+                    textfont={"size": style.text_info_font_size},
+                )
+            )
+        bar.update_layout(
+            title=style.title_template,
+            title_font_size=style.title_font_size,
+            xaxis={
+                "title": style.x_axis_title,
+                "tickangle": -45,
+                "tickmode": "array",
+                "tickfont": {"size": style.tick_font_size},
+            },
+            yaxis={
+                "title": style.y_axis_title,
+                "range": [0, 1.1],
+                "showticklabels": False,  # Hide the tick labels
+                "showgrid": False,  # Hide the grid
+                "zeroline": False,  # Hide the zero line
+            },
+            barmode="stack",
+            showlegend=True,
+            legend={"title": style.legend_title, "font": {"size": style.legend_font_size}},
+            margin=style.margins,
+            plot_bgcolor=style.background_color,
+        )
+        self.bar: dict = bar.to_plotly_json()
+
+    def figure(self, data: pd.DataFrame, mask: pd.Series, width: int | None = None, height: int | None = None) -> tuple[go.Figure, bool]:
+        """Figure object of the `figure_dict`, created without validation."""
+        figure, is_pie = self.figure_dict(data, mask, width, height)
+        return go.Figure(figure, _validate=False), is_pie
+
+    def figure_dict(self, data: pd.DataFrame, mask: pd.Series, width: int | None = None, height: int | None = None) -> tuple[dict, bool]:
+        """
+        Figure of the KPI table rows selected by the mask: a stacked bar chart by class, a pie chart for a single class.
+        Returns the figure dict (with numpy arrays as data) and whether it is a pie chart (or an empty placeholder).
+        """
+        filtered_data: pd.DataFrame = data[mask]
+
+        # Handle case where there's no data
+        if len(filtered_data) == 0:
+            return self.empty, True
+
+        # Handle case where there's only one row
+        if len(filtered_data) == 1:
+            values = filtered_data[self.style.column_names].to_numpy(dtype=float)[0]
+            shown = values != 0
+            pie_values = values[shown]
+            (trace,) = self.pie["data"]
+            trace = {
+                **trace,
+                "labels": [name for name, is_shown in zip(self.style.column_names, shown, strict=True) if is_shown],
+                "values": pie_values,
+                "text": percent_labels(pie_values, decimals=1),
+                "marker": {"colors": [color for color, is_shown in zip(self.style.colors, shown, strict=True) if is_shown]},
+            }
+            title = {**self.pie["layout"]["title"], "text": self.style.singular_title_template.format(x=filtered_data.index[0])}
+            return {"data": [trace], "layout": {**self.pie["layout"], "title": title}}, True
+
+        classes = filtered_data.index.to_numpy()
+        traces = []
+        for trace, name in zip(self.bar["data"], self.style.column_names, strict=True):
+            values = filtered_data[name].to_numpy(dtype=float)
+            traces.append({**trace, "x": classes, "y": values, "text": percent_labels(values), "customdata": classes})
+        layout = self.bar["layout"]
+        layout = {**layout, "xaxis": {**layout["xaxis"], "ticktext": truncate_labels(filtered_data.index, self.style.truncate_len), "tickvals": classes}}
+        if width is not None:
+            layout["width"] = width
+        if height is not None:
+            layout["height"] = height
+        return {"data": traces, "layout": layout}, False
+
+
+def build_figure(data: pd.DataFrame, mask: pd.Series, style: PlotStyle, width: int | None = None, height: int | None = None) -> tuple[go.Figure, bool]:
+    """Figure of the KPI table rows selected by the mask (see `FigureTemplate.figure`), for a one-off style."""
+    return FigureTemplate(style).figure(data, mask, width, height)
+
+
+def cached_figure(
+    template: FigureTemplate,
+    figure_cache: LruCache | None,
+    name: str,
+    data: pd.DataFrame,
+    mask: pd.Series,
+    width: int | None = None,
+    height: int | None = None,
+) -> tuple[dict, bool]:
+    """
+    Figure dict of the KPI table rows selected by the mask in the style of the template (see `FigureTemplate.figure_dict`).
+    Figures of the tables carrying a cache key (see `KpiAggregator`) are memoized in the cache under the style of the template.
+    Only the arguments are read, so the figures of a plot can be built in any thread from a template taken in the GUI thread.
+    """
+    table_key = data.attrs.get("cache_key")
+    if table_key is None or figure_cache is None:
+        return template.figure_dict(data, mask, width, height)
+
+    key = (table_key[0], "figure", name, table_key, mask.to_numpy(dtype=bool).tobytes(), width, height, template.style.key())
+    cached = figure_cache.get(key)
+    if cached is None:
+        cached = template.figure_dict(data, mask, width, height)
+        figure_cache.put(key, cached)
+    return cached
+
+
+class FigureEncoder(json.JSONEncoder):
+    """
+    Encoder of plain figure dicts for plotly.js. Numeric arrays are written as typed-array buffers
+    (`{"dtype": "f8", "bdata": <base64>}`, decoded by plotly.js without parsing every number), other arrays as lists.
+    """
+
+    def default(self, o: Any) -> Any:
+        if isinstance(o, np.ndarray):
+            if o.dtype.kind == "f" or (o.dtype.kind in "iu" and o.size and o.min() >= TYPED_INT_MIN and o.max() <= TYPED_INT_MAX):
+                dtype = "<f8" if o.dtype.kind == "f" else "<i4"
+                return {"dtype": dtype[1:], "bdata": base64.b64encode(np.ascontiguousarray(o, dtype=dtype).tobytes()).decode("ascii")}
+            return o.tolist()
+        if isinstance(o, np.generic):
+            return o.item()
+        return super().default(o)
+
+
+def figure_json(figure: dict) -> str:
+    """
+    JSON of a figure dict (see `FigureTemplate.figure_dict`), as drawn by `Plotly.react` on the plot pages.
+    Written directly by the standard encoder, without the validation and the NaN clean-up pass of plotly's encoder.
+    """
+    return json.dumps(figure, cls=FigureEncoder, separators=(",", ":"), ensure_ascii=False)
+
+
+def figure_hash(figure_json: str) -> str:
+    """Content hash of the figure JSON: figures with equal hashes look the same, so a shown one is not drawn again."""
+    return hashlib.blake2b(figure_json.encode("utf-8"), digest_size=16).hexdigest()
@@ -0,0 +1,234 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from src.backend.models.bitmap_index import BitmapIndex
+from src.backend.models.kpi_cube import IncrementalCounts, KpiCube
+from src.backend.models.lru_cache import LruCache
+
+CLASS_COLUMN: str = "Класс ИС ИМЗ / Наименование"
+REGISTRY_COLUMN: str = "Наличие в реестре Мин связи российского ПО"
+STATUS_COLUMN: str = "Статус принадлежности к целевой архитектуре / Наименование"
+STAGE_COLUMN: str = "Этап ЖЦ / Наименование"
+LANDSCAPE_COLUMN: str = "ИТ-ландшафт / Наименование"
+IMPORT_COLUMN: str = "Целевая ИС для задач импортозамещения"
+COUNT_COLUMN: str = "Кол-во систем"
+
+FILTER_COLUMNS: list[str] = [STATUS_COLUMN, STAGE_COLUMN, LANDSCAPE_COLUMN, IMPORT_COLUMN]
+# Columns of the systems listed in the drill-down of a class, followed by the source column of the KPI
+SYSTEM_COLUMNS: list[str] = [
+    "Инвентарный номер",
+    "Наименование",
+    "Краткое наименование",
+    "Ответственный за развитие / ФИО",
+    "Технический владелец / ФИО",
+    *FILTER_COLUMNS,
+]
+
+REGISTRY_VALUES: list[str] = ["Нет в реестре", "Есть в реестре", "(пусто)"]
+EXISTANCE_VALUES: list[str] = ["Нет", "Да", "В разработке", "Не используется", "(пусто)"]
+EXISTANCE_MAPPING: dict = {
+    "нет": "Нет",
+    "минус": "Нет",
+    "да": "Да",
+    "в разработке": "В разработке",
+    "разработка": "В разработке",
+    "не используют": "Не используется",
+    "?": "(пусто)",
+    "(пусто)": "(пусто)",
+}
+
+# Every KPI: source column, mapping of the raw values to the table columns, order of the table columns.
+# Missing values are mapped as "(пусто)", values absent in the mapping count in the total of the class only.
+KPI_METRICS: dict[str, dict] = {
+    "registry": {"column": REGISTRY_COLUMN, "mapping": {0: "Нет в реестре", 1: "Есть в реестре"}, "values": REGISTRY_VALUES},
+    "OS": {"column": "Наличие имз ОС", "mapping": EXISTANCE_MAPPING, "values": EXISTANCE_VALUES},
+    "virtualization": {"column": "Наличие имз Виртуализации", "mapping": EXISTANCE_MAPPING, "values": EXISTANCE_VALUES},
+    "DBMS": {"column": "Наличие имз СУБД", "mapping": EXISTANCE_MAPPING, "values": EXISTANCE_VALUES},
+}
+
+
+def normalize_kpi_values(data_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Frame with the class column and one column per KPI holding the name of the table column of every system.
+    Computed once per dataset, all filters reuse it.
+    """
+    normalized = pd.DataFrame({CLASS_COLUMN: data_df[CLASS_COLUMN].to_numpy()}, index=data_df.index)
+    for name, metric in KPI_METRICS.items():
+        values = data_df[metric["column"]].map(metric["mapping"])
+        normalized[name] = values.where(data_df[metric["column"]].notna(), "(пусто)")
+    return normalized
+
+
+def move_empty_class_first(data: pd.DataFrame) -> pd.DataFrame:
+    idx = data.index.to_list()
+    if "(пусто)" in idx:
+        idx.remove("(пусто)")
+        idx.insert(0, "(пусто)")
+    return data.reindex(idx)
+
+
+def kpi_table(counts: pd.DataFrame, values: list[str]) -> pd.DataFrame:
+    """
+    Share table of the KPI from the number of systems by class and value code
+    (the last value code is for the values not shown in the table). Classes are expected in sorted order.
+    """
+    if counts.empty:
+        return pd.DataFrame(columns=values)
+
+    counts_array = counts.to_numpy()
+    system_count = counts_array.sum(axis=1)
+    table = pd.DataFrame(counts_array[:, : len(values)] / system_count[:, np.newaxis], index=counts.index.rename(None), columns=values)
+    table[COUNT_COLUMN] = system_count
+    return move_empty_class_first(table)
+
+
+def dataset_fingerprint(data_df: pd.DataFrame) -> str:
+    """Content hash of the dataset, used in the cache keys of everything computed from it."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(",".join(map(str, data_df.columns)).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(data_df.astype(str), index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+class KpiAggregator:
+    """
+    Computes the tables of all tabs for the dataset.
+
+    At creation the filter columns get a bitmap index and every KPI gets a cube of system counts
+    over the four filter dimensions, the class and the value, so a filter change sums the cube cells instead of scanning the systems.
+    The row mask of a filter (e.g. for exports or drill-downs) comes from the bitmap index,
+    the systems behind a cell of a table are selected by the class and value codes kept from the build (see `system_rows`).
+
+    Computed tables are memoized in the LRU cache under `(dataset fingerprint, "table", KPI name, filter)`,
+    the cache may be shared with other consumers (e.g. plots) and outlive the aggregator.
+    Every table carries its cache key in `DataFrame.attrs["cache_key"]`.
+
+    In incremental mode every KPI keeps the counts of the last computed filter, so toggling values of one filter
+    only adds or subtracts the counts of those values (see `IncrementalCounts`).
+    """
+
+    def __init__(self, data_df: pd.DataFrame, cache: LruCache | None = None, incremental: bool = True) -> None:  # noqa: FBT001, FBT002
+        self.data_df = data_df
+        self.cache = cache if cache is not None else LruCache()
+        self.incremental = incremental
+        self.cubes: dict[str, KpiCube] = {}
+        self.counters: dict[str, IncrementalCounts] = {}
+        self.index: BitmapIndex | None = None
+        self.fingerprint = ""
+        if data_df.empty:
+            return
+
+        self.fingerprint = dataset_fingerprint(data_df)
+        self.normalized = normalize_kpi_values(data_df)
+        self.index = BitmapIndex(data_df, FILTER_COLUMNS)
+        dimension_codes = [self.index.codes[column] for column in FILTER_COLUMNS]
+        dimensions = [self.index.categories[column] for column in FILTER_COLUMNS]
+        class_codes, classes = pd.factorize(data_df[CLASS_COLUMN], sort=True, use_na_sentinel=False)
+        # Codes of every system, kept for the drill-downs (see `system_rows`)
+        self.class_codes: np.ndarray = class_codes
+        self.classes = pd.Index(classes)
+        self.value_codes: dict[str, np.ndarray] = {}
+
+        for name, metric in KPI_METRICS.items():
+            values = metric["values"]
+            # Values absent in the table get the last code
+            value_codes = pd.Index(values).get_indexer(self.normalized[name])
+            value_codes[value_codes < 0] = len(values)
+            self.value_codes[name] = value_codes
+            self.cubes[name] = KpiCube.build(dimension_codes, dimensions, class_codes, pd.Index(classes), value_codes, values)
+            self.counters[name] = IncrementalCounts(self.cubes[name])
+
+    @staticmethod
+    def filter_key(*filters: list[str] | None) -> tuple:
+        """Canonical form of the filter: a frozenset of the selected values per dimension."""
+        return tuple(None if selected is None else frozenset(selected) for selected in filters)
+
+    def cache_key(self, name: str, *filters: list[str] | None) -> tuple:
+        return (self.fingerprint, "table", name, self.filter_key(*filters))
+
+    def aggregate(
+        self,
+        status: list[str] | None = None,
+        stage: list[str] | None = None,
+        landscape: list[str] | None = None,
+        import_type: list[str] | None = None,
+    ) -> dict[str, pd.DataFrame | None]:
+        """Tables of all KPIs for the filter, None for every KPI if there is no data at all."""
+        return {name: self.table(name, status, stage, landscape, import_type) for name in KPI_METRICS}
+
+    def row_mask(
+        self,
+        status: list[str] | None = None,
+        stage: list[str] | None = None,
+        landscape: list[str] | None = None,
+        import_type: list[str] | None = None,
+    ) -> np.ndarray:
+        """Boolean mask of the systems matching the filter."""
+        if self.index is None:
+            return np.zeros(len(self.data_df), dtype=bool)
+        return self.index.mask([status, stage, landscape, import_type])
+
+    def system_rows(
+        self,
+        name: str,
+        class_name: str,
+        value: str | None = None,
+        status: list[str] | None = None,
+        stage: list[str] | None = None,
+        landscape: list[str] | None = None,
+        import_type: list[str] | None = None,
+    ) -> np.ndarray:
+        """
+        Positions of the systems of the class (and of the KPI value, if given) matching the filter, in the order of the dataset.
+        Only the positions are materialized, the rows themselves are read from `data_df` by the consumer.
+        """
+        if self.index is None or class_name not in self.classes:
+            return np.empty(0, dtype=np.intp)
+        mask = self.row_mask(status, stage, landscape, import_type)
+        mask &= self.class_codes == self.classes.get_loc(class_name)
+        if value is not None:
+            mask &= self.value_codes[name] == KPI_METRICS[name]["values"].index(value)
+        return np.flatnonzero(mask)
+
+    def system_columns(self, name: str) -> list[str]:
+        """Columns of the drill-down of the KPI present in the dataset."""
+        columns = [*SYSTEM_COLUMNS, KPI_METRICS[name]["column"]]
+        return [column for column in columns if column in self.data_df.columns]
+
+    def filter_stats(self, column: str) -> dict[str, int]:
+        """Number of systems for every value of the filter column."""
+        if self.index is None:
+            return {}
+        return self.index.value_stats(column)
+
+    def update_stats(self) -> dict[str, int]:
+        """Number of delta and full recomputes of the counts over all KPIs."""
+        return {
+            "delta_updates": sum(counter.delta_updates for counter in self.counters.values()),
+            "full_updates": sum(counter.full_updates for counter in self.counters.values()),
+        }
+
+    def table(
+        self,
+        name: str,
+        status: list[str] | None = None,
+        stage: list[str] | None = None,
+        landscape: list[str] | None = None,
+        import_type: list[str] | None = None,
+    ) -> pd.DataFrame | None:
+        """Table of the KPI for the filter, None if there is no data at all."""
+        if self.data_df.empty:
+            return None
+
+        key = self.cache_key(name, status, stage, landscape, import_type)
+        table = self.cache.get(key)
+        if table is None:
+            selections = [status, stage, landscape, import_type]
+            cube = self.cubes[name]
+            counts = self.counters[name].update(selections) if self.incremental else cube.counts_table(selections)
+            table = kpi_table(counts, cube.values)
+            table.attrs["cache_key"] = key
+            self.cache.put(key, table)
+        return table
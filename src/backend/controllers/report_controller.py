@@ -0,0 +1,68 @@
+import json
+import re
+from pathlib import Path
+
+import pandas as pd
+
+from src.backend.controllers.dashboard_controller import load_data_sheet0
+from src.backend.controllers.kpi_controller import CLASS_COLUMN, KPI_METRICS, KpiAggregator
+from src.backend.models.data_cache import DataCache
+
+OUTPUT_FORMATS: list[str] = ["csv", "json"]
+
+
+def compute_kpi_tables(
+    file_path: Path,
+    status: list[str] | None = None,
+    stage: list[str] | None = None,
+    landscape: list[str] | None = None,
+    import_type: list[str] | None = None,
+    kpi_names: list[str] | None = None,
+    cache: DataCache | None = None,
+) -> dict[str, pd.DataFrame]:
+    """
+    Class-level KPI tables of the workbook for the filter, without any GUI.
+    `None` filters don't filter the dimension, `None` KPI names select all KPIs.
+    """
+    data = load_data_sheet0(file_path, cache)
+    aggregator = KpiAggregator(data, incremental=False)
+    tables: dict[str, pd.DataFrame] = {}
+    for name in kpi_names or list(KPI_METRICS):
+        table = aggregator.table(name, status, stage, landscape, import_type)
+        tables[name] = table if table is not None else pd.DataFrame(columns=KPI_METRICS[name]["values"])
+    return tables
+
+
+def table_records(table: pd.DataFrame) -> list[dict]:
+    """Rows of the KPI table as JSON-compatible dicts, the class is in the class column."""
+    return table.rename_axis(CLASS_COLUMN).reset_index().to_dict(orient="records")
+
+
+def kpi_tables_to_json(tables: dict[str, pd.DataFrame]) -> str:
+    return json.dumps({name: table_records(table) for name, table in tables.items()}, ensure_ascii=False, indent=2)
+
+
+def kpi_table_to_csv(table: pd.DataFrame) -> str:
+    return table.to_csv(index_label=CLASS_COLUMN)
+
+
+def write_kpi_tables(tables: dict[str, pd.DataFrame], output_dir: Path, output_format: str) -> list[Path]:
+    """Writes the tables to the directory: one `<KPI name>.csv` per table or a single `kpi.json`. Returns the written files."""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    if output_format == "json":
+        file_path = output_dir / "kpi.json"
+        file_path.write_text(kpi_tables_to_json(tables), encoding="utf-8")
+        return [file_path]
+
+    files = []
+    for name, table in tables.items():
+        file_path = output_dir / f"{name}.csv"
+        # BOM, so that Excel detects the encoding
+        file_path.write_text(kpi_table_to_csv(table), encoding="utf-8-sig")
+        files.append(file_path)
+    return files
+
+
+def plain_error_message(error: Exception) -> str:
+    """Error message without the HTML markup used in the message boxes of the GUI."""
+    return re.sub(r"\s+", " ", re.sub(r"<[^>]+>", " ", str(error))).strip()
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+
+
+class BitmapIndex:
+    """
+    Bitmap index of the filter columns.
+
+    Every distinct value of every column gets a packed bitmap (one bit per row, `np.packbits`).
+    A selection is an OR of the bitmaps within a column and an AND across the columns,
+    the resulting row mask can be reused by any consumer of the filtered rows.
+    """
+
+    def __init__(self, data_df: pd.DataFrame, columns: list[str]) -> None:
+        self.columns = columns
+        self.row_count = len(data_df)
+        self.codes: dict[str, np.ndarray] = {}
+        self.categories: dict[str, pd.Index] = {}
+        self.bitmaps: dict[str, np.ndarray] = {}  # column -> (distinct values x packed bytes)
+        self.value_counts: dict[str, np.ndarray] = {}
+
+        for column in columns:
+            codes, categories = pd.factorize(data_df[column], use_na_sentinel=False)
+            self.codes[column] = codes
+            self.categories[column] = pd.Index(categories)
+            self.value_counts[column] = np.bincount(codes, minlength=len(categories))
+            self.bitmaps[column] = np.packbits(codes[np.newaxis, :] == np.arange(len(categories))[:, np.newaxis], axis=1)
+
+    @property
+    def byte_count(self) -> int:
+        return (self.row_count + 7) // 8
+
+    def column_bitmap(self, column: str, selected: list[str]) -> np.ndarray:
+        """Packed bitmap of the rows having one of the selected values in the column."""
+        positions = np.flatnonzero(self.categories[column].isin(selected))
+        if len(positions) == 0:
+            return np.zeros(self.byte_count, dtype=np.uint8)
+        return np.bitwise_or.reduce(self.bitmaps[column][positions], axis=0)
+
+    def select(self, selections: list[list[str] | None]) -> np.ndarray:
+        """Packed bitmap of the rows matching the selection of every column. `None` does not filter the column."""
+        bitmap = np.full(self.byte_count, 0xFF, dtype=np.uint8)
+        for column, selected in zip(self.columns, selections, strict=True):
+            if selected is not None:
+                bitmap &= self.column_bitmap(column, selected)
+        return bitmap
+
+    def mask(self, selections: list[list[str] | None]) -> np.ndarray:
+        """Boolean row mask of the selection."""
+        return np.unpackbits(self.select(selections), count=self.row_count).astype(bool)
+
+    def count(self, selections: list[list[str] | None]) -> int:
+        """Number of rows matching the selection."""
+        return int(np.unpackbits(self.select(selections), count=self.row_count).sum())
+
+    def cardinality(self, column: str) -> int:
+        """Number of distinct values in the column."""
+        return len(self.categories[column])
+
+    def value_stats(self, column: str) -> dict[str, int]:
+        """Number of rows for every distinct value of the column."""
+        return dict(zip(self.categories[column], self.value_counts[column].tolist(), strict=True))
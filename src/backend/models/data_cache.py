@@ -0,0 +1,148 @@
+import hashlib
+import json
+import pickle
+import time
+from contextlib import suppress
+from pathlib import Path
+
+import pandas as pd
+
+
+class DataCache:
+    """
+    Persistent cache of parsed workbooks.
+
+    Every entry is the cleaned DataFrame pickled with its NumPy blocks (fast to load, no openpyxl involved)
+    and is keyed by the workbook path, size, modification time and content hash.
+    Least recently used entries are evicted when the total size exceeds `max_size_bytes`.
+    """
+
+    FORMAT_VERSION: int = 1
+    INDEX_FILE: str = "index.json"
+
+    def __init__(self, cache_dir: Path, max_size_bytes: int = 500 * 1024 * 1024) -> None:
+        self.cache_dir = cache_dir
+        self.max_size_bytes = max_size_bytes
+
+    @staticmethod
+    def file_hash(file_path: Path, chunk_size: int = 1024 * 1024) -> str:
+        """Returns the content hash of the file."""
+        digest = hashlib.blake2b(digest_size=16)
+        with file_path.open("rb") as f:
+            while chunk := f.read(chunk_size):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def make_key(self, file_path: Path, schema: str = "") -> dict:
+        """Builds the cache key of the workbook. `schema` distinguishes different parsers of the same file."""
+        stat = file_path.stat()
+        return {
+            "path": str(file_path.resolve()),
+            "size": stat.st_size,
+            "mtime": stat.st_mtime_ns,
+            "hash": self.file_hash(file_path),
+            "schema": schema,
+            "version": self.FORMAT_VERSION,
+        }
+
+    @staticmethod
+    def entry_name(key: dict) -> str:
+        key_str = json.dumps(key, sort_keys=True, ensure_ascii=False)
+        return hashlib.blake2b(key_str.encode("utf-8"), digest_size=16).hexdigest() + ".pkl"
+
+    def load(self, key: dict) -> pd.DataFrame | None:
+        """Returns the cached DataFrame for the key or None if there is no valid entry."""
+        name = self.entry_name(key)
+        entry_file = self.cache_dir / name
+        if not entry_file.exists():
+            return None
+        try:
+            with entry_file.open("rb") as f:
+                data = pickle.load(f)  # noqa: S301 - the cache is written only by the application itself
+        except Exception:  # noqa: BLE001
+            self.remove(name)
+            return None
+        if not isinstance(data, pd.DataFrame):
+            self.remove(name)
+            return None
+
+        index = self.read_index()
+        if name in index:
+            index[name]["last_used"] = time.time()
+            self.write_index(index)
+        return data
+
+    def store(self, key: dict, data: pd.DataFrame) -> None:
+        """Stores the DataFrame for the key and evicts old entries if the cache is too big."""
+        name = self.entry_name(key)
+        entry_file = self.cache_dir / name
+        tmp_file = entry_file.with_suffix(".tmp")
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with tmp_file.open("wb") as f:
+                pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+            tmp_file.replace(entry_file)
+        except OSError:
+            # The cache is optional, e.g. the application folder may be read-only
+            with suppress(OSError):
+                tmp_file.unlink(missing_ok=True)
+            return
+
+        index = self.read_index()
+        # Only one entry per workbook path is kept, older versions of the file are useless
+        for old_name in [n for n, info in index.items() if info["path"] == key["path"] and n != name]:
+            self.remove_file(old_name)
+            del index[old_name]
+        index[name] = {"path": key["path"], "bytes": entry_file.stat().st_size, "last_used": time.time()}
+        self.write_index(self.evict(index))
+
+    def evict(self, index: dict) -> dict:
+        """Removes least recently used entries until the cache fits in `max_size_bytes`."""
+        total = sum(info["bytes"] for info in index.values())
+        for name in sorted(index, key=lambda n: index[n]["last_used"]):
+            if total <= self.max_size_bytes:
+                break
+            total -= index[name]["bytes"]
+            self.remove_file(name)
+            del index[name]
+        return index
+
+    def remove(self, name: str) -> None:
+        self.remove_file(name)
+        index = self.read_index()
+        if name in index:
+            del index[name]
+            self.write_index(index)
+
+    def remove_file(self, name: str) -> None:
+        with suppress(OSError):
+            (self.cache_dir / name).unlink(missing_ok=True)
+
+    def clear(self) -> None:
+        """Removes all entries from the cache."""
+        for name in self.read_index():
+            self.remove_file(name)
+        self.write_index({})
+
+    def read_index(self) -> dict:
+        index_file = self.cache_dir / self.INDEX_FILE
+        if not index_file.exists():
+            return {}
+        try:
+            with index_file.open(encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        # Forget entries whose files were removed outside the application
+        return {name: info for name, info in index.items() if (self.cache_dir / name).exists()}
+
+    def write_index(self, index: dict) -> None:
+        index_file = self.cache_dir / self.INDEX_FILE
+        tmp_file = index_file.with_suffix(".tmp")
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with tmp_file.open("w", encoding="utf-8") as f:
+                json.dump(index, f, ensure_ascii=False, indent=4)
+            tmp_file.replace(index_file)
+        except OSError:
+            return
@@ -0,0 +1,165 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+
+class KpiCube:
+    """
+    Number of systems by (filter dimensions..., class, value) for one KPI.
+
+    The cube is stored as a sparse NumPy array in coordinate format: one row of `coords` per non-empty cell
+    and the number of systems of the cell in `counts`. A filter is applied to the cells, not to the systems,
+    so its cost depends on the number of distinct combinations only.
+    Value code `len(values)` holds the systems whose value is not one of `values`.
+    """
+
+    def __init__(
+        self,
+        dimensions: list[pd.Index],
+        classes: pd.Index,
+        values: list[str],
+        coords: np.ndarray,
+        counts: np.ndarray,
+    ) -> None:
+        self.dimensions = dimensions
+        self.classes = classes
+        self.values = values
+        self.coords = coords
+        self.counts = counts
+        self._value_cells: dict[int, list[np.ndarray]] = {}
+
+    @classmethod
+    def build(
+        cls,
+        dimension_codes: list[np.ndarray],
+        dimensions: list[pd.Index],
+        class_codes: np.ndarray,
+        classes: pd.Index,
+        value_codes: np.ndarray,
+        values: list[str],
+    ) -> "KpiCube":
+        """Builds the cube from integer codes of every system (one array per dimension)."""
+        shape = (*(len(categories) for categories in dimensions), len(classes), len(values) + 1)
+        cell_codes = np.ravel_multi_index([*dimension_codes, class_codes, value_codes], shape)
+        cells, counts = np.unique(cell_codes, return_counts=True)
+        coords = np.column_stack(np.unravel_index(cells, shape)).astype(np.int64)
+        return cls(dimensions, classes, values, coords, counts.astype(np.int64))
+
+    @property
+    def cell_count(self) -> int:
+        return len(self.counts)
+
+    def dimension_masks(self, selections: list[list[str] | None]) -> list[np.ndarray | None]:
+        """Mask of the selected categories of every dimension, `None` for a dimension selected as a whole."""
+        return [
+            None if selected is None else np.asarray(categories.isin(selected)) for categories, selected in zip(self.dimensions, selections, strict=True)
+        ]
+
+    def cells_mask(self, dimension_masks: list[np.ndarray | None], cells: np.ndarray | None = None, skip_axis: int | None = None) -> np.ndarray:
+        """Mask of the cells (all of them or the given positions) matching the masks of every dimension except `skip_axis`."""
+        coords = self.coords if cells is None else self.coords[cells]
+        mask = np.ones(len(coords), dtype=bool)
+        for axis, selected_codes in enumerate(dimension_masks):
+            if selected_codes is not None and axis != skip_axis:
+                mask &= selected_codes[coords[:, axis]]
+        return mask
+
+    def selection_mask(self, selections: list[list[str] | None]) -> np.ndarray:
+        """Mask of the cells matching the selected values of every dimension. `None` selects the whole dimension."""
+        return self.cells_mask(self.dimension_masks(selections))
+
+    def value_cells(self, axis: int) -> list[np.ndarray]:
+        """Positions of the cells of every category of the dimension, computed on first use."""
+        if axis not in self._value_cells:
+            order = np.argsort(self.coords[:, axis], kind="stable")
+            bounds = np.searchsorted(self.coords[order, axis], np.arange(1, len(self.dimensions[axis])))
+            self._value_cells[axis] = np.split(order, bounds)
+        return self._value_cells[axis]
+
+    def cell_counts(self, cells: np.ndarray) -> np.ndarray:
+        """
+        Dense number of systems by class (rows) and value code (columns, the last one is for other values)
+        of the cells given by a mask or by positions.
+        """
+        value_count = len(self.values) + 1
+        class_axis = len(self.dimensions)
+        # Crosstab of (class, value) code pairs, one bincount over the combined codes
+        pair_codes = self.coords[cells, class_axis] * value_count + self.coords[cells, class_axis + 1]
+        counts = np.bincount(pair_codes, weights=self.counts[cells], minlength=len(self.classes) * value_count)
+        return counts.astype(np.int64).reshape(len(self.classes), value_count)
+
+    def value_counts(self, axis: int, code: int, dimension_masks: list[np.ndarray | None]) -> np.ndarray:
+        """Dense counts of one category of the dimension, the other dimensions are filtered by their masks."""
+        cells = self.value_cells(axis)[code]
+        return self.cell_counts(cells[self.cells_mask(dimension_masks, cells, skip_axis=axis)])
+
+    def counts_frame(self, counts: np.ndarray) -> pd.DataFrame:
+        """Frame of the dense counts, only the classes with at least one system are present."""
+        present = np.flatnonzero(counts.any(axis=1))
+        return pd.DataFrame(counts[present], index=self.classes[present], columns=range(len(self.values) + 1))
+
+    def counts_table(self, selections: list[list[str] | None]) -> pd.DataFrame:
+        """
+        Number of systems by class (rows) and value code (columns, the last one is for other values)
+        for the selection. Only the classes with at least one system are present.
+        """
+        return self.counts_frame(self.cell_counts(self.selection_mask(selections)))
+
+
+class IncrementalCounts:
+    """
+    Dense counts of the cube for the last selection, updated by deltas.
+
+    When the new selection differs from the last one by a single value of a single dimension, the counts
+    of that value are added or subtracted, so only the cells of the value are visited.
+    Any other change (e.g. several dimensions at once) falls back to a full recompute.
+    Updates are serialized, as tables may be computed in several threads.
+    """
+
+    def __init__(self, cube: KpiCube) -> None:
+        self.cube = cube
+        self.selected_codes: list[np.ndarray] | None = None  # mask of the selected categories of every dimension
+        self.counts: np.ndarray | None = None
+        self.delta_updates = 0
+        self.full_updates = 0
+        self._lock = threading.Lock()
+
+    def toggled_value(self, selected_codes: list[np.ndarray]) -> tuple[int, int] | None:
+        """(axis, category code) of the only value toggled since the last selection, None if there is no such value."""
+        if self.selected_codes is None:
+            return None
+        toggled = [(axis, np.flatnonzero(old != new)) for axis, (old, new) in enumerate(zip(self.selected_codes, selected_codes, strict=True))]
+        toggled = [(axis, codes) for axis, codes in toggled if len(codes) > 0]
+        if len(toggled) != 1 or len(toggled[0][1]) != 1:
+            return None
+        return toggled[0][0], int(toggled[0][1][0])
+
+    def update(self, selections: list[list[str] | None]) -> pd.DataFrame:
+        """Counts table of the selection (see `KpiCube.counts_table`)."""
+        with self._lock:
+            return self._update(selections)
+
+    def _update(self, selections: list[list[str] | None]) -> pd.DataFrame:
+        dimension_masks = self.cube.dimension_masks(selections)
+        selected_codes = [
+            np.ones(len(categories), dtype=bool) if codes is None else codes
+            for categories, codes in zip(self.cube.dimensions, dimension_masks, strict=True)
+        ]
+        unchanged = self.selected_codes is not None and all(np.array_equal(old, new) for old, new in zip(self.selected_codes, selected_codes, strict=True))
+        toggled = self.toggled_value(selected_codes)
+
+        if self.counts is None or (toggled is None and not unchanged):
+            counts = self.cube.cell_counts(self.cube.cells_mask(dimension_masks))
+            self.full_updates += 1
+        elif toggled is None:
+            counts = self.counts
+        else:
+            axis, code = toggled
+            delta = self.cube.value_counts(axis, code, dimension_masks)
+            counts = self.counts + delta if selected_codes[axis][code] else self.counts - delta
+            self.delta_updates += 1
+
+        self.counts = counts
+        self.selected_codes = selected_codes
+        return self.cube.counts_frame(counts)
@@ -1,17 +1,25 @@
 import webbrowser
+from contextlib import suppress
 from datetime import UTC, datetime
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
-from PyQt6.QtCore import Qt, pyqtSignal
-from PyQt6.QtWidgets import QFileDialog, QMainWindow, QProgressDialog, QTabWidget, QVBoxLayout, QWidget
+from PyQt6.QtCore import Qt, QThread, QThreadPool, QTimer, pyqtSignal
+from PyQt6.QtWidgets import QFileDialog, QLabel, QMainWindow, QMessageBox, QProgressDialog, QTabWidget, QVBoxLayout, QWidget
 
-from src.backend.controllers.dashboard_controller import parse_data_sheet0
+from src.backend.controllers.export_controller import ExportTask, ImageExporter
+from src.backend.controllers.kpi_controller import IMPORT_COLUMN, LANDSCAPE_COLUMN, STAGE_COLUMN, STATUS_COLUMN, KpiAggregator
+from src.backend.models.data_cache import DataCache
+from src.backend.models.lru_cache import LruCache
 from src.ui.widgets.dashboard_tab import DashboardTab
 from src.ui.widgets.existance_tab import ExistanceTab
+from src.ui.widgets.plot_page import PlotPagePool
 from src.ui.widgets.registry_tab import RegistryTab
 from src.ui.widgets.settings_window import SettingsWindow
 from src.ui.widgets.toolbar import ToolBar
+from src.ui.workers.data_loader import DataLoader
+from src.ui.workers.export_worker import ExportWorker
 from src.utils import utils
 from src.utils.config import AppConfig
 
@@ -26,6 +34,12 @@ class MainWindow(QMainWindow):
         self.current_landscape: list[str] = []
         self.current_import: list[str] = []
         self.data = pd.DataFrame()
+        # Tables and figures computed for the filters, keys start with the fingerprint of the dataset
+        self.result_cache = LruCache(AppConfig.get_param("aggregation_cache_size"))
+        self.aggregator = KpiAggregator(self.data, self.result_cache)
+        self.data_cache = DataCache(Path(AppConfig.get_some_path("cache")))
+        # Pages of the plots of the 4 tabs and of the dashboard: plotly.js is loaded on them while the workbook is parsed (see `initialize`)
+        PlotPagePool.warm_up(8)
         self.setWindowTitle(AppConfig.APP_NAME)
         self.setGeometry(50, 50, 1200, 900)
         self.setMinimumSize(*AppConfig.WINDOW_MINIMIUM_SIZE)
@@ -37,19 +51,18 @@ class MainWindow(QMainWindow):
 
         self.tabs = QTabWidget()
         self.tabs.setStyleSheet("QTabBar::tab { font-size: 18px; }")
-        self.tabs.tabBarClicked.connect(self.tab_changed)
         layout.addWidget(self.tabs)
 
-        self.registry_tab = RegistryTab(self, self.filter_changed, self.get_data)
+        self.registry_tab = RegistryTab(self, self.filter_changed, self.get_aggregator, self.get_systems)
         self.tabs.addTab(self.registry_tab, "Наличие в реестре")
 
-        self.OS_existance_tab = ExistanceTab("Наличие имз ОС", "OS", self, self.filter_changed, self.get_data)
+        self.OS_existance_tab = ExistanceTab("OS", self, self.filter_changed, self.get_aggregator, self.get_systems)
         self.tabs.addTab(self.OS_existance_tab, "Наличие имз ОС")
 
-        self.virtualization_existance_tab = ExistanceTab("Наличие имз Виртуализации", "virtualization", self, self.filter_changed, self.get_data)
+        self.virtualization_existance_tab = ExistanceTab("virtualization", self, self.filter_changed, self.get_aggregator, self.get_systems)
         self.tabs.addTab(self.virtualization_existance_tab, "Наличие имз Виртуализации")
 
-        self.DBMS_existance_tab = ExistanceTab("Наличие имз СУБД", "DBMS", self, self.filter_changed, self.get_data)
+        self.DBMS_existance_tab = ExistanceTab("DBMS", self, self.filter_changed, self.get_aggregator, self.get_systems)
         self.tabs.addTab(self.DBMS_existance_tab, "Наличие имз СУБД")
 
         self.dashboard_tab = DashboardTab(
@@ -69,62 +82,185 @@ class MainWindow(QMainWindow):
             self.virtualization_existance_tab,
             self.DBMS_existance_tab,
         ]
+        for tab in self.tab_list:
+            tab.plot.figure_cache = self.result_cache
+
+        # Tabs only get marked dirty by the changes, the work is done for the tab being shown
+        self.tabs.currentChanged.connect(self.update_current_tab)
+        self.filter_changed.connect(self.update_current_tab)
+
+        self.cache_stats_label = QLabel(self)
+        status_bar = self.statusBar()
+        if status_bar is not None:
+            status_bar.addPermanentWidget(self.cache_stats_label)
+        self.filter_changed.connect(self.update_cache_stats)
+
+        # Bursts of filter changes (e.g. clicking through several options) are collapsed into one `filter_changed` with the latest filter
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(AppConfig.get_param("filter_debounce_interval"))
+        self.filter_timer.timeout.connect(self.emit_filter_changed)
 
         self.topbar: ToolBar | None = None
 
-    def tab_changed(self, index: int) -> None:
-        if index == self.tabs.count() - 1:
+        # Data is loaded in a separate thread, see `initialize`
+        self.loader: DataLoader | None = None
+        self.loader_thread = QThread(self)
+        self.progress_dialog: QProgressDialog | None = None
+
+        # Charts of all tabs are exported in a separate thread by one Kaleido process, see `export_all`
+        self.image_exporter = ImageExporter()
+        self.exporter: ExportWorker | None = None
+        self.export_thread = QThread(self)
+        self.export_progress_dialog: QProgressDialog | None = None
+
+    def update_current_tab(self) -> None:
+        """Updates the shown tab if it is dirty. The dashboard pulls the figures of all tabs."""
+        current_tab = self.tabs.currentWidget()
+        if current_tab is self.dashboard_tab:
+            for tab in self.tab_list:
+                tab.update_if_dirty()
             self.dashboard_tab.selected()
+        elif isinstance(current_tab, RegistryTab | ExistanceTab):
+            current_tab.update_if_dirty()
+
+    def export_all(self) -> None:
+        """
+        Exports the charts of all tabs as PNG files (and the checked rows of their tables, if the user wants them)
+        to a chosen folder. The files are written in the background, the progress is shown in a non-modal dialog.
+        """
+        if self.export_thread.isRunning():
+            utils.show_info_dialog("Экспорт выполняется", "Дождитесь окончания текущего экспорта.")
+            return
 
-    def load_data(self) -> None:
+        # Export what the filters show, the refreshes still running in the thread pool are finished here
+        if self.filter_timer.isActive():
+            self.emit_filter_changed()
         try:
-            # Load file path and data
-            file_path: Path = AppConfig.get_param("data_path")
-            while file_path == "":
-                utils.show_info_dialog("Не выбран файл", "Пожалуйста, выберите файл.")
-                self.load_document(initialize=False)
-                file_path = AppConfig.get_param("data_path")
-            data: pd.DataFrame = parse_data_sheet0(file_path)
-            self.data = data
-
-        except FileNotFoundError:
+            for tab in self.tab_list:
+                tab.update_if_dirty(wait=True)
+        except Exception as e:  # noqa: BLE001
+            utils.show_error_dialog("Ошибка при экспорте", f"Не удалось рассчитать КПЭ для экспорта:<br><span style='color:red'>{e!s}</span>")
+            return
+
+        current_date = datetime.now(tz=UTC).strftime("%d.%m.%Y")
+        Path(AppConfig.get_some_path("exports")).mkdir(exist_ok=True)
+        output_dir = QFileDialog.getExistingDirectory(None, "Папка для экспорта графиков", AppConfig.get_some_path("exports"))
+        if not output_dir:
+            return
+        include_tables = QMessageBox.question(self, "Экспорт всех графиков", "Сохранить также данные таблиц (CSV)?") == QMessageBox.StandardButton.Yes
+
+        tasks: list[ExportTask] = []
+        for i, tab in enumerate(self.tab_list):
+            task = tab.export_task(f"{current_date} - {self.tabs.tabText(i)}", include_tables)
+            if task is not None:
+                tasks.append(task)
+        if not tasks:
+            utils.show_info_dialog("Нет данных", "Нет графиков для экспорта.")
+            return
+
+        exporter = ExportWorker(tasks, Path(output_dir), self.image_exporter)
+        exporter.moveToThread(self.export_thread)
+        self.exporter = exporter
+
+        self.export_progress_dialog = QProgressDialog("Экспорт графиков", None, 0, exporter.file_count(), self)
+        self.export_progress_dialog.setMinimumSize(400, 120)
+        self.export_progress_dialog.setWindowTitle("Экспорт всех графиков")
+        self.export_progress_dialog.setWindowModality(Qt.WindowModality.NonModal)
+        self.export_progress_dialog.setMinimumDuration(0)
+        self.export_progress_dialog.show()
+
+        exporter.progress.connect(self.on_export_progress)
+        exporter.finished.connect(lambda files: self.on_export_finished(output_dir, files))
+        exporter.failed.connect(self.on_export_failed)
+        for finished in (exporter.finished, exporter.failed):
+            finished.connect(self.export_thread.quit)
+        self.export_thread.finished.connect(exporter.deleteLater)
+
+        with suppress(TypeError):
+            self.export_thread.started.disconnect()
+        self.export_thread.started.connect(exporter.run)
+        self.export_thread.start()
+
+    def on_export_progress(self, done_count: int, file_name: str) -> None:
+        if self.export_progress_dialog is not None:
+            self.export_progress_dialog.setLabelText(f"Сохранён файл: {file_name}")
+            self.export_progress_dialog.setValue(done_count)
+
+    def on_export_finished(self, output_dir: str, files: list[Path]) -> None:
+        self.close_export_progress_dialog()
+        self.exporter = None
+        if files:
+            webbrowser.open(output_dir)
+
+    def on_export_failed(self, error: Exception) -> None:
+        self.close_export_progress_dialog()
+        self.exporter = None
+        utils.show_error_dialog("Ошибка при экспорте", f"Произошла ошибка во время экспорта:<br><span style='color:red'>{error!s}</span>")
+
+    def close_export_progress_dialog(self) -> None:
+        if self.export_progress_dialog is not None:
+            self.export_progress_dialog.close()
+            self.export_progress_dialog = None
+
+    def select_data_path(self) -> str:
+        """Returns the path of the data file, asks the user to choose the file if it is not set."""
+        file_path: str = AppConfig.get_param("data_path")
+        while file_path == "":
+            utils.show_info_dialog("Не выбран файл", "Пожалуйста, выберите файл.")
+            self.load_document(initialize=False)
+            file_path = AppConfig.get_param("data_path")
+        return file_path
+
+    def show_load_error(self, file_path: str, error: Exception) -> None:
+        if isinstance(error, FileNotFoundError):
             utils.show_error_dialog(
                 "Ошибка: Файл не найден", f"Файл <i>{file_path!s}</i> не существует. Пожалуйста, проверьте правильность пути или выберите другой файл."
             )
-            AppConfig.reset_param("data_path")
 
-        except pd.errors.EmptyDataError:
+        elif isinstance(error, pd.errors.EmptyDataError):
             utils.show_error_dialog("Ошибка: Пустой файл данных", f"Файл <i>{file_path!s}</i> пуст. Пожалуйста, убедитесь, что файл содержит данные.")
-            AppConfig.reset_param("data_path")
 
-        except pd.errors.ParserError:
+        elif isinstance(error, pd.errors.ParserError):
             utils.show_error_dialog(
                 "Ошибка: Некорректный файл данных",
                 f"Файл <i>{file_path!s}</i> имеет некорректные данные. Пожалуйста, проверьте правильность данных в файле.",
             )
-            AppConfig.reset_param("data_path")
 
-        except ValueError as e:
+        elif isinstance(error, ValueError):
             utils.show_error_dialog(
                 "Ошибка: Некорректный файл данных",
-                f"Файл <i>{file_path!s}</i> имеет некорректные данные.<br>{e!s}",
+                f"Файл <i>{file_path!s}</i> имеет некорректные данные.<br>{error!s}",
             )
-            AppConfig.reset_param("data_path")
 
-        except Exception as e:  # noqa: BLE001
+        else:
             utils.show_error_dialog(
-                "Неизвестная ошибка", f"Произошла неизвестная ошибка с файлом <i>{file_path!s}</i>:<br><span style='color:red'>{e!s}</span>"
+                "Неизвестная ошибка", f"Произошла неизвестная ошибка с файлом <i>{file_path!s}</i>:<br><span style='color:red'>{error!s}</span>"
             )
-            AppConfig.reset_param("data_path")
 
-        else:
-            return
-
-        self.data = pd.DataFrame()
+        AppConfig.reset_param("data_path")
 
     def get_data(self) -> pd.DataFrame:
         return self.data
 
+    def get_aggregator(self) -> KpiAggregator:
+        """Aggregator of the loaded data. All KPIs are computed in one pass and shared between the tabs."""
+        return self.aggregator
+
+    def get_systems(
+        self,
+        name: str,
+        class_name: str,
+        value: str | None = None,
+        status: list[str] | None = None,
+        stage: list[str] | None = None,
+        landscape: list[str] | None = None,
+        import_type: list[str] | None = None,
+    ) -> tuple[pd.DataFrame, np.ndarray, list[str]]:
+        """Dataset, positions of the systems behind a cell of the KPI table and the columns of the drill-down."""
+        rows = self.aggregator.system_rows(name, class_name, value, status, stage, landscape, import_type)
+        return self.aggregator.data_df, rows, self.aggregator.system_columns(name)
+
     def create_toolbar(self) -> None:
         if self.topbar is not None:
             self.removeToolBar(self.topbar)
@@ -148,6 +284,7 @@ class MainWindow(QMainWindow):
                 "Целевая архитектура",
                 self.status_options,
                 self.on_status_change,
+                self.aggregator.filter_stats(STATUS_COLUMN),
             )
 
             self.topbar.add_fixed_separator(30)
@@ -161,6 +298,7 @@ class MainWindow(QMainWindow):
                 "Этап ЖЦ",
                 self.stage_options,
                 self.on_stage_change,
+                self.aggregator.filter_stats(STAGE_COLUMN),
             )
 
             self.topbar.add_fixed_separator(30)
@@ -174,6 +312,7 @@ class MainWindow(QMainWindow):
                 "ИТ-ландшафт",
                 self.landscape_options,
                 self.on_landscape_change,
+                self.aggregator.filter_stats(LANDSCAPE_COLUMN),
             )
 
             self.topbar.add_fixed_separator(30)
@@ -187,13 +326,20 @@ class MainWindow(QMainWindow):
                 "Целевая ИС",
                 self.import_options,
                 self.on_import_change,
+                self.aggregator.filter_stats(IMPORT_COLUMN),
             )
 
         self.topbar.add_separator()
         self.topbar.add_button(
             "Загрузить данные", AppConfig.get_resource_path("resources/assets/icons/windows/shell32-276.ico"), lambda: self.load_document(initialize=True)
         )
+        self.topbar.add_button(
+            "Обновить данные",
+            AppConfig.get_resource_path("resources/assets/icons/windows/shell32-276.ico"),
+            lambda: self.initialize(force_reparse=True),
+        )
         self.topbar.add_button("Экспорт графика", AppConfig.get_resource_path("resources/assets/icons/windows/shell32-265.ico"), self.export_plot)
+        self.topbar.add_button("Экспорт всех графиков", AppConfig.get_resource_path("resources/assets/icons/windows/shell32-265.ico"), self.export_all)
         self.topbar.add_button("Настройки", AppConfig.get_resource_path("resources/assets/icons/windows/shell32-315.ico"), self.open_settings)
 
         self.addToolBar(Qt.ToolBarArea.TopToolBarArea, self.topbar)
@@ -206,21 +352,29 @@ class MainWindow(QMainWindow):
     def get_filter(self) -> tuple[list[str], list[str], list[str], list[str]]:
         return (self.current_status, self.current_stage, self.current_landscape, self.current_import)
 
+    def schedule_filter_changed(self) -> None:
+        """Restarts the debounce timer, `filter_changed` is emitted when the filter stays unchanged for the interval."""
+        self.filter_timer.start()
+
+    def emit_filter_changed(self) -> None:
+        self.filter_timer.stop()
+        self.filter_changed.emit(*self.get_filter())
+
     def on_status_change(self, values: list[str]) -> None:
         self.current_status = values
-        self.filter_changed.emit(*self.get_filter())
+        self.schedule_filter_changed()
 
     def on_stage_change(self, values: list[str]) -> None:
         self.current_stage = values
-        self.filter_changed.emit(*self.get_filter())
+        self.schedule_filter_changed()
 
     def on_landscape_change(self, values: list[str]) -> None:
         self.current_landscape = values
-        self.filter_changed.emit(*self.get_filter())
+        self.schedule_filter_changed()
 
     def on_import_change(self, values: list[str]) -> None:
         self.current_import = values
-        self.filter_changed.emit(*self.get_filter())
+        self.schedule_filter_changed()
 
     def load_document(self, initialize: bool = True) -> None:  # noqa: FBT001, FBT002
         """
@@ -261,6 +415,10 @@ class MainWindow(QMainWindow):
         Prompts the user to choose the file path using a file dialog, handles any errors,
         and opens the exported image upon success.
         """
+        # Apply the filter changes still waiting for the debounce timer
+        if self.filter_timer.isActive():
+            self.emit_filter_changed()
+
         try:
             # Get current date and active tab name
             current_date = datetime.now(tz=UTC).strftime("%d.%m.%Y")
@@ -271,6 +429,9 @@ class MainWindow(QMainWindow):
                 utils.show_info_dialog("Не поддерживается", "Экспорт графиков для данной вкладки не поддерживается.")
                 return
 
+            # Export what the filter shows, even if its refresh is still running in the thread pool
+            self.tab_list[active_tab_index].update_if_dirty(wait=True)
+
             export_folder = Path(AppConfig.get_some_path("exports"))
 
             if not export_folder.exists():
@@ -310,47 +471,117 @@ class MainWindow(QMainWindow):
             # Handle any other unexpected errors
             utils.show_error_dialog("Ошибка при экспорте", f"Произошла ошибка во время экспорта:<br><span style='color:red'>{e!s}</span>")
 
-    def initialize(self) -> None:
-        # Create a progress dialog
-        progress_dialog = QProgressDialog("Загрузка данных", None, 0, 6)
-        current_progress = 0
-        progress_dialog.setMinimumSize(400, 120)
-        progress_dialog.setWindowTitle("Загрузка данных")
-        progress_dialog.setWindowModality(Qt.WindowModality.ApplicationModal)
-        progress_dialog.setAutoClose(True)  # Automatically close when done
-        progress_dialog.setAutoReset(True)  # Reset progress bar after close
-        progress_dialog.show()
-
-        # Load data and Initialize toolbar and update progress
-        self.load_data()
+    def initialize(self, force_reparse: bool = False) -> None:  # noqa: FBT001, FBT002
+        """
+        Loads the data and initializes all tabs.
+        If `force_reparse` is set, the workbook is parsed again even if it is present in the cache.
+
+        Parsing and computation of the tables run in the loader thread,
+        the widgets are updated in `on_data_loaded` when the results arrive.
+        """
+        self.stop_loading()
+        # Pending filter changes belong to the old toolbar
+        self.filter_timer.stop()
+        self.filter_timer.setInterval(AppConfig.get_param("filter_debounce_interval"))
+        file_path = self.select_data_path()
+        self.data_cache.max_size_bytes = AppConfig.get_param("cache_max_size") * 1024 * 1024
+
+        self.result_cache.resize(AppConfig.get_param("aggregation_cache_size"))
+        loader = DataLoader(Path(file_path), self.data_cache, self.result_cache, force_reparse=force_reparse)
+        loader.moveToThread(self.loader_thread)
+        self.loader = loader
+
+        # Create a progress dialog, the last stage is the update of the widgets
+        self.progress_dialog = QProgressDialog("Загрузка данных", "Отмена", 0, loader.stage_count + 1, self)
+        self.progress_dialog.setMinimumSize(400, 120)
+        self.progress_dialog.setWindowTitle("Загрузка данных")
+        self.progress_dialog.setWindowModality(Qt.WindowModality.ApplicationModal)
+        self.progress_dialog.setAutoClose(True)  # Automatically close when done
+        self.progress_dialog.setAutoReset(True)  # Reset progress bar after close
+        self.progress_dialog.setMinimumDuration(0)
+        # The loader is busy in its own thread, so the lambda (living in the GUI thread) sets the cancellation flag directly
+        self.progress_dialog.canceled.connect(lambda: loader.cancel())
+        self.progress_dialog.show()
+
+        # Signals are emitted in the loader thread, slots of the window are queued to the GUI thread
+        loader.progress.connect(self.on_load_progress)
+        loader.loaded.connect(self.on_data_loaded)
+        loader.failed.connect(lambda error: self.on_load_failed(file_path, error))
+        loader.cancelled.connect(self.on_load_cancelled)
+        for finished in (loader.loaded, loader.failed, loader.cancelled):
+            finished.connect(self.loader_thread.quit)
+        self.loader_thread.finished.connect(loader.deleteLater)
+
+        with suppress(TypeError):
+            self.loader_thread.started.disconnect()
+        self.loader_thread.started.connect(loader.run)
+        self.loader_thread.start()
+
+    def stop_loading(self) -> None:
+        """Cancels the running loader and waits for its thread."""
+        if self.loader is not None and self.loader_thread.isRunning():
+            self.loader.cancel()
+            self.loader_thread.quit()
+            self.loader_thread.wait()
+        self.loader = None
+
+    def on_load_progress(self, stage: int, description: str) -> None:
+        if self.progress_dialog is not None:
+            self.progress_dialog.setLabelText(description)
+            self.progress_dialog.setValue(stage)
+
+    def on_data_loaded(self, data: pd.DataFrame, aggregator: KpiAggregator, tables: dict[str, pd.DataFrame | None]) -> None:
+        self.data = data
+        self.aggregator = aggregator
+        # Entries of the previous workbook are useless now
+        self.result_cache.retain(lambda key: key[0] == aggregator.fingerprint)
         self.create_toolbar()
-        current_progress += 1
-        progress_dialog.setValue(current_progress)
-
-        # Initialize registry_tab and update progress
-        self.registry_tab.initialize()
-        current_progress += 1
-        progress_dialog.setValue(current_progress)
-
-        # Initialize OS_existance_tab and update progress
-        self.OS_existance_tab.initialize()
-        current_progress += 1
-        progress_dialog.setValue(current_progress)
-
-        # Initialize virtualization_existance_tab and update progress
-        self.virtualization_existance_tab.initialize()
-        current_progress += 1
-        progress_dialog.setValue(current_progress)
-
-        # Initialize DBMS_existance_tab and update progress
-        self.DBMS_existance_tab.initialize()
-        current_progress += 1
-        progress_dialog.setValue(current_progress)
-
-        # Initialize dashboard_tab and update progress
+        self.set_tab_tables(tables)
+        # Kaleido starts in the background, so that the first export doesn't wait for it
+        pool = QThreadPool.globalInstance()
+        if pool is not None:
+            pool.start(self.image_exporter.warm_up)
+
+    def on_load_failed(self, file_path: str, error: Exception) -> None:
+        self.close_progress_dialog()
+        self.show_load_error(file_path, error)
+        self.data = pd.DataFrame()
+        self.aggregator = KpiAggregator(self.data, self.result_cache)
+        self.create_toolbar()
+        self.set_tab_tables({})
+
+    def on_load_cancelled(self) -> None:
+        self.close_progress_dialog()
+        # Previous data stays loaded, the toolbar is needed to choose another file
+        if self.topbar is None:
+            self.create_toolbar()
+
+    def set_tab_tables(self, tables: dict[str, pd.DataFrame | None]) -> None:
+        if self.progress_dialog is not None:
+            self.progress_dialog.setLabelText("Построение графиков")
+        for tab in self.tab_list:
+            tab.set_data(tables.get(tab.kpi_name))
         self.dashboard_tab.initialize()
-        current_progress += 1
-        progress_dialog.setValue(current_progress)
+        self.update_current_tab()
+        self.update_cache_stats()
+        self.close_progress_dialog()
+
+    def update_cache_stats(self) -> None:
+        """Shows the hit/miss counters of the cache of tables and figures and the number of recomputes in the status bar."""
+        stats = self.result_cache.stats()
+        updates = self.aggregator.update_stats()
+        self.cache_stats_label.setText(
+            f"Кэш расчётов: попаданий {stats['hits']}, промахов {stats['misses']}, записей {stats['size']} из {stats['max_size']}; "
+            f"пересчётов: частичных {updates['delta_updates']}, полных {updates['full_updates']}"
+        )
+
+    def close_progress_dialog(self) -> None:
+        if self.progress_dialog is not None:
+            self.progress_dialog.close()
+            self.progress_dialog = None
 
-        # Close the dialog when done
-        progress_dialog.close()
+    def closeEvent(self, event) -> None:  # noqa: N802
+        self.stop_loading()
+        self.export_thread.quit()
+        self.export_thread.wait()
+        super().closeEvent(event)
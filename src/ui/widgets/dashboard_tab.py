@@ -1,9 +1,8 @@
-from pathlib import Path
-
-from PyQt6.QtCore import Qt, QUrl, pyqtBoundSignal
+from PyQt6.QtCore import Qt, QTimer, pyqtBoundSignal
 from PyQt6.QtWebEngineWidgets import QWebEngineView
 from PyQt6.QtWidgets import QHBoxLayout, QScrollArea, QSplitter, QVBoxLayout, QWidget
 
+from src.ui.widgets.plot_page import PlotPage, PlotPagePool
 from src.utils.config import AppConfig
 
 
@@ -12,9 +11,18 @@ class DashboardTab(QWidget):
         super().__init__(parent)
         layout = QVBoxLayout(self)
 
-        self.plot_paths = [Path(AppConfig.get_some_path(f"html/{i}.html")) for i in ["registry", "virtualization", "DBMS", "OS"]]
-
-        self.plots = [self.create_plot(path) for path in self.plot_paths]
+        self.plot_names = ["registry", "virtualization", "DBMS", "OS"]
+
+        self.plot_pages: list[PlotPage] = []
+        self.plots = [self.create_plot() for _ in self.plot_names]
+        # Latest figure JSON of every plot, its hash and whether it is a pie
+        self.figures: dict[str, tuple[str, str, bool]] = {}
+        # Hashes of the figures drawn on the views. Views are updated only while the dashboard is shown,
+        # and only those whose latest figure differs from the drawn one
+        self.shown_hashes: dict[str, str] = {}
+        self.reload_timer = QTimer(self)
+        self.reload_timer.setSingleShot(True)
+        self.reload_timer.timeout.connect(self.reload_if_dirty)
         self.scroll_plots = [self.wrap_plot(plot) for plot in self.plots]
 
         vertical_splitter = QSplitter(Qt.Orientation.Vertical, self)
@@ -38,10 +46,11 @@ class DashboardTab(QWidget):
 
         if on_plot_updated is not None:
             for plot_updated in on_plot_updated:
-                plot_updated.connect(self.update_plots)
+                plot_updated.connect(self.on_plot_updated)
 
     def initialize(self) -> None:
-        self.update_plots()
+        if self.isVisible():
+            self.reload_if_dirty()
 
     def wrap_plot(self, plot: QWebEngineView) -> QScrollArea:
         scroll_plot_area = QScrollArea(self)
@@ -53,22 +62,43 @@ class DashboardTab(QWidget):
         return scroll_plot_area
 
     # plot using plotly
-    def create_plot(self, file_path: Path) -> QWebEngineView:
+    def create_plot(self) -> QWebEngineView:
         plot = QWebEngineView(self)
         plot.setMinimumSize(AppConfig.get_param("plot_min_width_dashboard"), AppConfig.get_param("plot_min_height_dashboard"))
-        if file_path.exists():
-            plot.load(QUrl.fromLocalFile(str(file_path)))
+        page = PlotPagePool.shared().acquire(plot)
+        plot.setPage(page)
+        self.plot_pages.append(page)
 
         return plot
 
     def selected(self) -> None:
+        self.reload_if_dirty()
         for i in range(4):
             self.scroll_plots[i].adjustSize()
 
-    def update_plots(self, file_updated: str = "", is_pie: bool = False) -> None:  # noqa: FBT001, FBT002
-        for i in range(4):
-            if self.plot_paths[i].exists():
-                self.plots[i].setMinimumSize(AppConfig.get_param("plot_min_width_dashboard"), AppConfig.get_param("plot_min_height_dashboard"))
-                if file_updated == str(self.plot_paths[i]) and is_pie:
-                    self.plots[i].setMinimumSize(0, 0)
-                self.plots[i].load(QUrl.fromLocalFile(str(self.plot_paths[i])))
+    def on_plot_updated(self, name: str, plot_json: str, content_hash: str, is_pie: bool) -> None:  # noqa: FBT001
+        self.figures[name] = (plot_json, content_hash, is_pie)
+        # Updates of several plots in a row are applied at once
+        if self.isVisible() and self.stale_plots():
+            self.reload_timer.start()
+
+    def stale_plots(self) -> list[str]:
+        """Names of the plots whose latest figure is not the one drawn on the dashboard."""
+        return [name for name, (_, content_hash, _) in self.figures.items() if self.shown_hashes.get(name) != content_hash]
+
+    def reload_if_dirty(self) -> None:
+        if self.stale_plots():
+            self.update_plots()
+
+    def update_plots(self) -> None:
+        """Draws the latest figures of the stale plots on their pages, the other views are left as is."""
+        stale_plots = self.stale_plots()
+        for i, name in enumerate(self.plot_names):
+            if name not in stale_plots:
+                continue
+            plot_json, content_hash, is_pie = self.figures[name]
+            self.plots[i].setMinimumSize(AppConfig.get_param("plot_min_width_dashboard"), AppConfig.get_param("plot_min_height_dashboard"))
+            if is_pie:
+                self.plots[i].setMinimumSize(0, 0)
+            self.plot_pages[i].show_figure(plot_json, content_hash)
+            self.shown_hashes[name] = content_hash
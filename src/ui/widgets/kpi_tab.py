@@ -0,0 +1,247 @@
+from collections.abc import Callable
+from functools import partial
+from typing import Any
+
+import numpy as np
+import pandas as pd
+from PyQt6.QtCore import QModelIndex, Qt, pyqtBoundSignal
+from PyQt6.QtWidgets import QHBoxLayout, QScrollArea, QSplitter, QVBoxLayout, QWidget
+
+from src.backend.controllers.export_controller import ExportTask
+from src.backend.controllers.figure_controller import KPI_PLOT_TEXTS, FigureTemplate, cached_figure, figure_hash, figure_json
+from src.backend.controllers.kpi_controller import KpiAggregator
+from src.backend.models.lru_cache import LruCache
+from src.ui.widgets.pandas_table import CheckableTableView
+from src.ui.widgets.plot_widget import PlotWidget
+from src.ui.widgets.systems_table import SystemsWindow
+from src.ui.workers.refresh_worker import RefreshCancelledError, RefreshScheduler
+from src.utils import utils
+from src.utils.config import AppConfig
+
+
+def compute_update(
+    name: str,
+    data: pd.DataFrame | None,
+    update_filter: tuple[list[str] | None, ...] | None,
+    aggregator: KpiAggregator | None,
+    template: FigureTemplate,
+    figure_cache: LruCache | None,
+    is_cancelled: Callable[[], bool],
+) -> tuple[pd.DataFrame | None, tuple[list[str] | None, ...] | None, tuple[str, str, bool] | None]:
+    """
+    Computes the table of the KPI for the filter (`None` keeps the data) and the figure JSON of its plot with its hash.
+    The filter is returned with the table, so that the tab knows which filter the shown table was computed for.
+    Runs in a pool thread on the snapshots taken by `KpiTab.update_if_dirty` and stops as soon as a newer update supersedes it.
+    """
+    if update_filter is not None and aggregator is not None:
+        data = aggregator.table(name, *update_filter)
+    if data is None:
+        return None, update_filter, None
+    if is_cancelled():
+        raise RefreshCancelledError
+    # The new table model has all rows checked
+    fig, is_pie = cached_figure(template, figure_cache, name, data, pd.Series(data=True, index=data.index))
+    if is_cancelled():
+        raise RefreshCancelledError
+    plot_json = figure_json(fig)
+    return data, update_filter, (plot_json, figure_hash(plot_json), is_pie)
+
+
+class KpiTab(QWidget):
+    """
+    Tab of a KPI: the table of the KPI by class next to its plot, recomputed for the filter of the toolbar.
+
+    Updates are computed in the thread pool and only while the tab is shown (see `update_if_dirty`).
+    Subclasses configure the KPI: the values of its columns, the column widths of the table and the colors of the plot.
+    """
+
+    def __init__(
+        self,
+        kpi_name: str,
+        kpi_values: list[str],
+        parent=None,
+        on_filter_changed: pyqtBoundSignal | None = None,
+        aggregator_getter: Callable[[], KpiAggregator] | None = None,
+        systems_getter: Callable[..., tuple[pd.DataFrame, np.ndarray, list[str]]] | None = None,
+        column_widths: list[int | None] | None = None,
+    ) -> None:
+        super().__init__(parent)
+        self.kpi_name = kpi_name
+        self.kpi_values = kpi_values
+        self.column_widths = column_widths
+        self.aggregator_getter = aggregator_getter
+        self.systems_getter = systems_getter
+        self.systems_window: SystemsWindow | None = None
+        self.data: pd.DataFrame | None = None
+        # The table and the plot are updated only when the tab is shown, see `update_if_dirty`
+        self.filter: tuple[list[str] | None, ...] = (None, None, None, None)
+        # Filter of the shown table, it lags behind `filter` until the update is applied (see `apply_update`)
+        self.data_filter: tuple[list[str] | None, ...] = (None, None, None, None)
+        self.data_outdated = False
+        self.dirty = False
+        # The updates are computed in the thread pool, only the result of the latest one is shown
+        self.refresher = RefreshScheduler(self)
+        self.refresher.finished.connect(self.apply_update)
+        self.refresher.failed.connect(self.show_update_error)
+        self.pending_update: Callable[[Callable[[], bool]], Any] | None = None
+        layout = QVBoxLayout(self)
+
+        # Main Table and plot
+        self.table = self.create_table()
+        self.table.checked_updated.connect(self.update_plot)
+        self.table.doubleClicked.connect(self.show_systems)
+        self.plot = self.create_plot()
+
+        self.scroll_plot_area = QScrollArea(self)
+        self.scroll_plot_area.setWidgetResizable(True)
+        self.scroll_plot_area.setWidget(self.plot)
+        self.scroll_plot_area.setMinimumWidth(AppConfig.get_param("scroll_area_min_width"))
+        self.scroll_plot_area.setMinimumHeight(AppConfig.get_param("scroll_area_min_height"))
+
+        content_layout = QHBoxLayout()
+        self.splitter = QSplitter(Qt.Orientation.Horizontal, self)
+        self.splitter.setOpaqueResize(False)
+        self.splitter.addWidget(self.table)
+        self.splitter.addWidget(self.scroll_plot_area)
+        self.splitter.splitterMoved.connect(self.splitter_changed)
+        self.table_min = True
+
+        content_layout.addWidget(self.splitter, stretch=1)
+        layout.addLayout(content_layout, stretch=1)
+
+        if on_filter_changed is not None:
+            on_filter_changed.connect(self.refresh)
+
+        self.on_resize()
+
+    def resizeEvent(self, event) -> None:  # noqa: N802
+        super().resizeEvent(event)
+        self.on_resize()
+
+    def splitter_changed(self) -> None:
+        self.table_min = self.splitter.sizes()[0] == AppConfig.get_param("table_min_width")
+
+    def on_resize(self) -> None:
+        if self.table_min:
+            self.splitter.setSizes([AppConfig.get_param("table_min_width"), self.width() - AppConfig.get_param("table_min_width")])
+
+    def plot_colors(self) -> list[str]:
+        """Colors of the KPI values on the plot, in the order of `kpi_values`."""
+        return [AppConfig.get_param("plot_red_color"), AppConfig.get_param("plot_green_color"), AppConfig.get_param("plot_gray_color")]
+
+    def reset_config(self) -> None:
+        self.plot.reset_config(self.plot_colors())
+
+    def create_table(self) -> CheckableTableView:
+        return CheckableTableView(self, minimum_width=AppConfig.get_param("table_min_width"))
+
+    # plot using plotly
+    def create_plot(self) -> PlotWidget:
+        return PlotWidget.from_config(
+            name=self.kpi_name,
+            x_axis_title="Классы",
+            y_axis_title="Процент",
+            column_names=self.kpi_values,
+            parent=self,
+            colors=self.plot_colors(),
+            **KPI_PLOT_TEXTS[self.kpi_name],
+        )
+
+    def update_plot(self) -> None:
+        if self.data is None:
+            return
+        self.plot.update_plot(self.data, self.table.get_checked_mask())
+
+    def set_table_model(self) -> None:
+        if self.data is None:
+            return
+        self.table.set_table_model(self.data, "Класс ИС ИМЗ", self.column_widths, percent_columns=self.kpi_values)
+
+    def set_data(self, data: pd.DataFrame | None) -> None:
+        """Sets the table computed elsewhere (e.g. by the data loader), the widgets are updated by `update_if_dirty`."""
+        # A running update belongs to the previous data, its result must not replace the new table
+        self.cancel_update()
+        self.reset_config()
+        self.data = data
+        # The tables of a new workbook are computed without filters, like the new toolbar
+        self.filter = (None, None, None, None)
+        self.data_filter = self.filter
+        self.data_outdated = False
+        self.dirty = True
+
+    def refresh(
+        self, status: list[str] | None = None, stage: list[str] | None = None, landscape: list[str] | None = None, import_type: list[str] | None = None
+    ) -> None:
+        """Remembers the new filter, the table is recomputed by `update_if_dirty`."""
+        self.cancel_update()
+        self.filter = (status, stage, landscape, import_type)
+        self.data_outdated = True
+        self.dirty = True
+
+    def cancel_update(self) -> None:
+        """Drops the running update, its result is outdated."""
+        self.refresher.cancel()
+        self.pending_update = None
+
+    def update_if_dirty(self, wait: bool = False) -> None:  # noqa: FBT001, FBT002
+        """
+        Recomputes the table and updates the widgets if the filter or the data changed since the last update.
+        The update runs in the thread pool, `wait` finishes it right away in the GUI thread (e.g. before exporting the plot).
+        The aggregator and the figure template are taken here, the update reads no state of the tab while it runs.
+        """
+        if self.data_outdated or self.dirty:
+            update_filter = self.filter if self.data_outdated else None
+            self.data_outdated = False
+            self.dirty = False
+            aggregator = self.aggregator_getter() if update_filter is not None and self.aggregator_getter is not None else None
+            template = self.plot.figure_template()
+            self.pending_update = partial(compute_update, self.kpi_name, self.data, update_filter, aggregator, template, self.plot.figure_cache)
+            self.refresher.submit(self.pending_update)
+        if wait and self.refresher.is_busy() and self.pending_update is not None:
+            self.refresher.cancel()
+            self.apply_update(self.pending_update(lambda: False))
+
+    def apply_update(self, result: tuple[pd.DataFrame | None, tuple[list[str] | None, ...] | None, tuple[str, str, bool] | None]) -> None:
+        """Shows the result of `compute_update`, called in the GUI thread."""
+        self.pending_update = None
+        data, data_filter, plot_figure = result
+        self.data = data
+        if data_filter is not None:
+            self.data_filter = data_filter
+        if data is None or plot_figure is None:
+            return
+        self.set_table_model()
+        self.plot.show_figure(*plot_figure)
+
+    def show_update_error(self, error: Exception) -> None:
+        self.pending_update = None
+        utils.show_error_dialog("Ошибка", f"Не удалось рассчитать КПЭ:<br><span style='color:red'>{error!s}</span>")
+
+    def show_systems(self, index: QModelIndex) -> None:
+        """
+        Opens the drill-down of the systems of the class of the row, only of the KPI value if its column was clicked.
+        The systems are selected by the filter of the shown table, not by the toolbar filter that may not be applied yet.
+        """
+        index = self.table.source_index(index)
+        if self.data is None or self.systems_getter is None or not index.isValid():
+            return
+        class_name = str(self.data.index[index.row()])
+        column = self.data.columns[index.column() - 2] if index.column() > 1 else None
+        value = column if column in self.kpi_values else None
+        data_df, rows, columns = self.systems_getter(self.kpi_name, class_name, value, *self.data_filter)
+        title = f'Системы класса "{class_name}"' + (f" ({value})" if value is not None else "")
+        self.systems_window = SystemsWindow(title, data_df, rows, columns, self)
+        self.systems_window.show()
+
+    def export_plot(self, file_path: str) -> None:
+        if self.data is None:
+            return
+        self.plot.export_plot(self.data, self.table.get_checked_mask(), file_path)
+
+    def export_task(self, name: str, include_table: bool = False) -> ExportTask | None:  # noqa: FBT001, FBT002
+        """Export of the plot (and the checked rows of the table) as shown, for the batch export of all tabs."""
+        if self.data is None:
+            return None
+        mask = self.table.get_checked_mask()
+        table = self.data[mask] if include_table else None
+        return ExportTask(name, self.plot.export_figure_task(self.data, mask), table)
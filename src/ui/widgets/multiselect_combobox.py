@@ -1,11 +1,22 @@
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import QModelIndex, Qt, pyqtSignal
 from PyQt6.QtGui import QFontMetrics
 from pyqt6_multiselect_combobox import MultiSelectComboBox
 
 
 class CustomMultiSelectComboBox(MultiSelectComboBox):
+    """
+    Multiselect combobox whose first item "(все)" checks or unchecks all options.
+
+    Check states are changed in bulk with the model signals blocked (see `set_selection`),
+    so that a change of the selection is announced once by `selection_changed` instead of once per item.
+    """
+
+    selection_changed = pyqtSignal(list)  # checked options without "(все)"
+
     def __init__(self, *args, **kwargs) -> None:
         super().__init__(*args, **kwargs)
+        self.bulk_update = False
+        self.model().dataChanged.connect(self.on_data_changed)
 
     def showPopup(self) -> None:  # noqa: N802
         self.setPopupMinimumWidthForItems()
@@ -24,9 +35,87 @@ class CustomMultiSelectComboBox(MultiSelectComboBox):
         if max_width:
             view.setMinimumWidth(max_width + 40)
 
+    def set_item_counts(self, counts: dict[str, int]) -> None:
+        """Show the number of systems of every option in its tooltip, the first option "(все)" gets the total."""
+        for i in range(self.model().rowCount()):
+            item = self.model().item(i)
+            count = sum(counts.values()) if i == 0 else counts.get(item.text(), 0)
+            item.setToolTip(f"Кол-во систем: {count}")
+
     def checked_mask(self) -> list[bool]:
         return [self.model().item(i).checkState() == Qt.CheckState.Checked for i in range(1, self.model().rowCount())]
 
+    def selected_options(self) -> list[str]:
+        return [self.model().item(i).data() for i in range(1, self.model().rowCount()) if self.model().item(i).checkState() == Qt.CheckState.Checked]
+
+    def set_all_checked(self, checked: bool) -> None:  # noqa: FBT001
+        self.set_selection([checked] * (self.model().rowCount() - 1))
+
+    def set_selection(self, mask: list[bool]) -> None:
+        """
+        Sets the check states of all options at once, the mask is in the order of `checked_mask`.
+        The views are updated by a single `dataChanged`, `selection_changed` is emitted if the selection changed.
+        """
+        model = self.model()
+        changed = mask != self.checked_mask()
+        blocked = model.blockSignals(True)  # noqa: FBT003
+        try:
+            for row, checked in enumerate(mask, start=1):
+                model.item(row).setCheckState(Qt.CheckState.Checked if checked else Qt.CheckState.Unchecked)
+            self.sync_all_item(mask)
+        finally:
+            model.blockSignals(blocked)
+        self.notify_rows(0, model.rowCount() - 1)
+        if changed:
+            self.selection_changed.emit(self.selected_options())
+
+    def sync_all_item(self, mask: list[bool]) -> bool:
+        """Checks "(все)" when all options are checked and unchecks it when none are. Returns whether its state changed."""
+        item_0 = self.model().item(0)
+        if item_0 is None:
+            return False
+        if all(mask):
+            state = Qt.CheckState.Checked
+        elif not any(mask):
+            state = Qt.CheckState.Unchecked
+        else:
+            return False
+        if item_0.checkState() == state:
+            return False
+        item_0.setCheckState(state)
+        return True
+
+    def notify_rows(self, first: int, last: int) -> None:
+        """Emits `dataChanged` of the rows changed with the model signals blocked, without handling it as a user change."""
+        model = self.model()
+        if last < first:
+            return
+        self.bulk_update = True
+        try:
+            model.dataChanged.emit(model.index(first, 0), model.index(last, 0), [Qt.ItemDataRole.CheckStateRole])
+        finally:
+            self.bulk_update = False
+
+    def on_data_changed(self, top_left: QModelIndex) -> None:
+        """Handles a check state toggled by the user in the popup."""
+        if self.bulk_update:
+            return
+        model = self.model()
+        if top_left.row() == 0:
+            item_0 = model.item(0)
+            self.set_all_checked(item_0 is not None and item_0.checkState() == Qt.CheckState.Checked)
+            return
+
+        mask = self.checked_mask()
+        blocked = model.blockSignals(True)  # noqa: FBT003
+        try:
+            all_item_changed = self.sync_all_item(mask)
+        finally:
+            model.blockSignals(blocked)
+        if all_item_changed:
+            self.notify_rows(0, 0)
+        self.selection_changed.emit(self.selected_options())
+
     def updateText(self) -> None:  # noqa: N802
         """
         Update the displayed text based on selected items.
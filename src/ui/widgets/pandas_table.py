@@ -5,14 +5,22 @@ if typing.TYPE_CHECKING:
 
 from typing import Any
 
+import numpy as np
 import pandas as pd
-from PyQt6.QtCore import QAbstractTableModel, QModelIndex, QRect, Qt, QVariant, pyqtSignal
+from PyQt6.QtCore import QAbstractProxyModel, QAbstractTableModel, QLocale, QModelIndex, QObject, QRect, Qt, QVariant, pyqtSignal
 from PyQt6.QtGui import QBrush, QColor, QFont
-from PyQt6.QtWidgets import QAbstractItemView, QHeaderView, QStyle, QStyleOptionButton, QTableView
+from PyQt6.QtWidgets import QAbstractItemView, QHeaderView, QStyle, QStyledItemDelegate, QStyleOptionButton, QTableView
 
 from src.utils.config import AppConfig
 
 
+def sort_codes(column: pd.Series) -> np.ndarray:
+    """Positions of the values of the column among its sorted unique values, NaN for the missing values."""
+    codes = pd.factorize(column, sort=True)[0].astype(float)
+    codes[codes < 0] = np.nan
+    return codes
+
+
 class CheckableHeaderView(QHeaderView):
     """A custom header with a checkbox in the first section."""
 
@@ -46,8 +54,24 @@ class CheckableHeaderView(QHeaderView):
             self.isChecked = not self.isChecked
             self.updateSection(0)  # Update the header to reflect the checkbox state
             self.sectionClicked.emit(0)  # Emit signal when header is clicked
+            # The checkbox section doesn't take part in the sorting
+            return
         super().mousePressEvent(event)
 
+    def mouseReleaseEvent(self, event):  # noqa: N802
+        if event.button() == Qt.MouseButton.LeftButton and self.logicalIndexAt(event.pos()) == 0:
+            return
+        super().mouseReleaseEvent(event)
+
+
+class PercentDelegate(QStyledItemDelegate):
+    """Shows the shares of the numeric columns as percents, formatted only when painted."""
+
+    def displayText(self, value: Any, locale: QLocale) -> str:  # noqa: N802
+        if isinstance(value, float):
+            return f"{value:.0%}"
+        return super().displayText(value, locale)
+
 
 class CheckableTableView(QTableView):
     checked_updated = pyqtSignal(name="checkedUpdated_table")
@@ -67,39 +91,64 @@ class CheckableTableView(QTableView):
         # Connect header click to toggle checkboxes in the model
         self._horizontalHeader.sectionClicked.connect(self.toggle_all_checkboxes)
 
+        # Sorting by a header click, unsorted until the first one (see `ArgsortProxyModel`)
+        self.table_model: PandasTableModel | None = None
+        self.proxy_model: ArgsortProxyModel | None = None
+        self.percent_delegate = PercentDelegate(self)
+        self._horizontalHeader.setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
+        self.setSortingEnabled(True)
+
     def get_checked_mask(self) -> pd.Series:
         """Returns a mask of all the checked rows as a pandas boolean mask."""
-        model = self.model()
-        if model is not None and isinstance(model, PandasTableModel):
-            return model.get_checked_mask()
+        if self.table_model is not None:
+            return self.table_model.get_checked_mask()
 
         return pd.Series()
 
+    def source_index(self, index: QModelIndex) -> QModelIndex:
+        """Index of the table model (in the order of the dataframe) for an index of the sorted view."""
+        model = self.model()
+        if isinstance(model, QAbstractProxyModel):
+            return model.mapToSource(index)
+        return index
+
     def toggle_all_checkboxes(self, index):
         """Toggle all checkboxes in the model based on header checkbox state."""
-        if index == 0:  # Only react if the checkbox header is clicked
-            model = self.model()
-            if model is not None and isinstance(model, PandasTableModel):
-                all_checked = self._horizontalHeader.isChecked
-                model.toggle_all_checkboxes(all_checked)
+        if index == 0 and self.table_model is not None:  # Only react if the checkbox header is clicked
+            all_checked = self._horizontalHeader.isChecked
+            self.table_model.toggle_all_checkboxes(all_checked)
 
     def toggle_row(self, index):
         """Toggle the checkbox state of a single row."""
-        model = self.model()
-        if model is not None and isinstance(model, PandasTableModel):
-            model.toggle_row(index)
-
-    def set_table_model(self, dataframe: pd.DataFrame, index_name: str = "", column_widths: list[int | None] | None = None):
-        """Set a new table model to the view."""
+        if self.table_model is not None:
+            self.table_model.toggle_row(index)
+
+    def set_table_model(
+        self,
+        dataframe: pd.DataFrame,
+        index_name: str = "",
+        column_widths: list[int | None] | None = None,
+        percent_columns: list[str] | None = None,
+    ):
+        """
+        Set a new table model to the view.
+        The values of `percent_columns` are kept numeric and shown as percents, the current sorting applies to the new model.
+        """
         if dataframe is None:
             return
 
         self.setModel(None)
         # Set the custom PandasTableModel
-        model = PandasTableModel(dataframe, index_name)
-        self.setModel(model)
+        model = PandasTableModel(dataframe, index_name, percent_columns)
+        self.table_model = model
+        self.proxy_model = ArgsortProxyModel(model)
+        self.proxy_model.sort(self._horizontalHeader.sortIndicatorSection(), self._horizontalHeader.sortIndicatorOrder())
+        self.setModel(self.proxy_model)
         model.checkedUpdated = lambda: self.checked_updated.emit()
 
+        for i in range(model.columnCount()):
+            self.setItemDelegateForColumn(i, self.percent_delegate if model.is_percent_column(i) else None)
+
         # Configure header and column widths
         self._horizontalHeader.setMinimumSectionSize(1)
         self._horizontalHeader.setSectionResizeMode(0, QHeaderView.ResizeMode.Fixed)
@@ -131,17 +180,46 @@ class CheckableTableView(QTableView):
 
 
 class PandasTableModel(QAbstractTableModel):
-    def __init__(self, dataframe: pd.DataFrame, index_name: str = "") -> None:
+    """
+    Table of the dataframe with a checkbox column and the index as the first data column.
+    Display values are computed once per column when the model is built, `data()` only indexes them:
+    strings, except for the percent columns which stay numeric and are formatted by `PercentDelegate`.
+    """
+
+    def __init__(self, dataframe: pd.DataFrame, index_name: str = "", percent_columns: list[str] | None = None) -> None:
         super().__init__()
         self._dataframe = dataframe
         self._index_name = index_name
-        self.checked_rows = [True] * len(self._dataframe)  # Track checkbox state for each row
+        self.checked_rows = np.ones(len(self._dataframe), dtype=bool)  # Track checkbox state for each row
+        self._checked_mask: pd.Series | None = None  # Mask of `checked_rows`, built on request after a change
         self.checkedUpdated: Callable[[], None] = lambda: None
 
-    def rowCount(self, _=None):  # noqa: N802
+        # Display values and sort keys by model column (the checkbox column has none)
+        columns = [dataframe.index.to_series(), *(dataframe.iloc[:, i] for i in range(len(dataframe.columns)))]
+        self._percent = [
+            False,
+            False,
+            *(column in (percent_columns or []) and pd.api.types.is_float_dtype(dataframe[column]) for column in dataframe.columns),
+        ]
+        self._display: list[list[Any]] = [
+            [],
+            *(
+                column.tolist() if is_percent else [str(value) for value in column.tolist()]
+                for column, is_percent in zip(columns, self._percent[1:], strict=True)
+            ),
+        ]
+        # Sortable values: the numbers of the numeric columns, the codes of the sorted unique values of the others.
+        # Missing values are NaN in both, so that they stay last in both directions (see `sort_order`)
+        self._sort_values: list[np.ndarray | None] = [
+            None,
+            *(column.to_numpy(dtype=float, na_value=np.nan) if pd.api.types.is_numeric_dtype(column) else sort_codes(column) for column in columns),
+        ]
+        self._sort_orders: dict[tuple[int, bool], np.ndarray] = {}
+
+    def rowCount(self, _: QModelIndex | None = None) -> int:  # noqa: N802
         return len(self._dataframe.index)
 
-    def columnCount(self, _=None):  # noqa: N802
+    def columnCount(self, _: QModelIndex | None = None) -> int:  # noqa: N802
         return len(self._dataframe.columns) + 2  # Extra column for the checkbox
 
     def data(self, index, role=Qt.ItemDataRole.DisplayRole):
@@ -151,14 +229,8 @@ class PandasTableModel(QAbstractTableModel):
         if role == Qt.ItemDataRole.CheckStateRole and index.column() == 0:
             return Qt.CheckState.Checked if self.checked_rows[index.row()] else Qt.CheckState.Unchecked
 
-        if role == Qt.ItemDataRole.DisplayRole:
-            if index.column() == 1:
-                value = self._dataframe.index[index.row()]
-                return QVariant(str(value))
-
-            if index.column() > 1:
-                value = self._dataframe.iloc[index.row(), index.column() - 2]
-                return QVariant(str(value))
+        if role == Qt.ItemDataRole.DisplayRole and index.column() > 0:
+            return self._display[index.column()][index.row()]
 
         # Gray out text for unchecked rows
         if role == Qt.ItemDataRole.ForegroundRole and not self.checked_rows[index.row()]:
@@ -169,8 +241,7 @@ class PandasTableModel(QAbstractTableModel):
     def setData(self, index: QModelIndex, value: Any, role: int = Qt.ItemDataRole.EditRole):  # noqa: N802
         if role == Qt.ItemDataRole.CheckStateRole and index.column() == 0:
             self.checked_rows[index.row()] = value != 0
-            self.dataChanged.emit(index, index, [Qt.ItemDataRole.CheckStateRole])
-            self.layoutChanged.emit()
+            self.rows_checked_changed(index.row(), index.row())
             self.checkedUpdated()
             return True
         return False
@@ -189,6 +260,27 @@ class PandasTableModel(QAbstractTableModel):
 
         return QVariant()
 
+    def is_percent_column(self, column: int) -> bool:
+        return self._percent[column]
+
+    def sort_order(self, column: int, descending: bool = False) -> np.ndarray | None:  # noqa: FBT001, FBT002
+        """
+        Rows of the model sorted by the column (stable, missing values last), `None` for the checkbox column.
+        Computed with `argsort` on the first request and cached.
+        """
+        if not 0 < column < len(self._sort_values):
+            return None
+        key = (column, descending)
+        if key not in self._sort_orders:
+            values = self._sort_values[column]
+            if values is None:
+                return None
+            if descending:
+                # Negated keys keep equal rows in their order, NaN stays last
+                values = -values
+            self._sort_orders[key] = np.argsort(values, kind="stable")
+        return self._sort_orders[key]
+
     def flags(self, index):
         if index.column() == 0:
             return Qt.ItemFlag.ItemIsUserCheckable | Qt.ItemFlag.ItemIsEnabled
@@ -196,19 +288,100 @@ class PandasTableModel(QAbstractTableModel):
 
     def toggle_all_checkboxes(self, check_state: bool):  # noqa: FBT001
         """Toggle the checkbox state of all rows."""
-        self.checked_rows = [check_state] * len(self.checked_rows)
+        self.checked_rows[:] = check_state
+        self.rows_checked_changed(0, len(self.checked_rows) - 1)
         self.checkedUpdated()
-        self.layoutChanged.emit()
 
     def toggle_row(self, index: int):
         """Toggle the checkbox state of a single row."""
         self.checked_rows[index] = not self.checked_rows[index]
         if index < 0:
             index = len(self.checked_rows) + index
-        self.dataChanged.emit(self.createIndex(index, 0), self.createIndex(index, 0), [Qt.ItemDataRole.CheckStateRole])
+        self.rows_checked_changed(index, index)
         self.checkedUpdated()
-        self.layoutChanged.emit()
+
+    def rows_checked_changed(self, first: int, last: int) -> None:
+        """Notifies the views about the check state (and the text color) of the rows, the layout stays valid."""
+        self._checked_mask = None
+        if last < first:
+            return
+        roles = [Qt.ItemDataRole.CheckStateRole, Qt.ItemDataRole.ForegroundRole]
+        self.dataChanged.emit(self.createIndex(first, 0), self.createIndex(last, self.columnCount() - 1), roles)
 
     def get_checked_mask(self) -> pd.Series:
         """Returns a mask of all the checked rows as a pandas boolean mask."""
-        return pd.Series(self.checked_rows, index=self._dataframe.index)
+        if self._checked_mask is None:
+            self._checked_mask = pd.Series(self.checked_rows.copy(), index=self._dataframe.index)
+        return self._checked_mask
+
+
+class ArgsortProxyModel(QAbstractProxyModel):
+    """
+    Sorted view of a `PandasTableModel`.
+
+    Sorting replaces the row permutation by the precomputed `argsort` of the column (see `PandasTableModel.sort_order`),
+    so rows are never compared one by one in Python as in `QSortFilterProxyModel`.
+    """
+
+    def __init__(self, model: PandasTableModel, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self._order = np.arange(model.rowCount())  # Row of the model for every row of the proxy
+        self._inverse = self._order.copy()  # Row of the proxy for every row of the model
+        self.setSourceModel(model)
+        model.dataChanged.connect(self.on_source_data_changed)
+
+    def table_model(self) -> PandasTableModel:
+        return typing.cast(PandasTableModel, self.sourceModel())
+
+    def index(self, row: int, column: int, parent: QModelIndex | None = None) -> QModelIndex:
+        if (parent is not None and parent.isValid()) or not (0 <= row < self.rowCount() and 0 <= column < self.columnCount()):
+            return QModelIndex()
+        return self.createIndex(row, column)
+
+    def parent(self, index: QModelIndex | None = None) -> Any:
+        if index is None:
+            return super().parent()
+        return QModelIndex()
+
+    def rowCount(self, parent: QModelIndex | None = None) -> int:  # noqa: N802
+        if parent is not None and parent.isValid():
+            return 0
+        return len(self._order)
+
+    def columnCount(self, parent: QModelIndex | None = None) -> int:  # noqa: N802
+        if parent is not None and parent.isValid():
+            return 0
+        return self.table_model().columnCount()
+
+    def mapToSource(self, proxy_index: QModelIndex) -> QModelIndex:  # noqa: N802
+        if not proxy_index.isValid():
+            return QModelIndex()
+        return self.table_model().index(int(self._order[proxy_index.row()]), proxy_index.column())
+
+    def mapFromSource(self, source_index: QModelIndex) -> QModelIndex:  # noqa: N802
+        if not source_index.isValid():
+            return QModelIndex()
+        return self.createIndex(int(self._inverse[source_index.row()]), source_index.column())
+
+    def sort(self, column: int, order: Qt.SortOrder = Qt.SortOrder.AscendingOrder) -> None:
+        rows = self.table_model().sort_order(column, descending=order == Qt.SortOrder.DescendingOrder)
+        if rows is None:
+            return
+
+        self.layoutAboutToBeChanged.emit()
+        persistent = self.persistentIndexList()
+        source_rows = [int(self._order[index.row()]) for index in persistent]
+        self._order = rows
+        self._inverse = np.empty_like(rows)
+        self._inverse[rows] = np.arange(len(rows))
+        self.changePersistentIndexList(
+            persistent, [self.index(int(self._inverse[row]), index.column()) for row, index in zip(source_rows, persistent, strict=True)]
+        )
+        self.layoutChanged.emit()
+
+    def on_source_data_changed(self, top_left: QModelIndex, bottom_right: QModelIndex, roles: list[int]) -> None:
+        """Forwards the change of the rows of the model as one range covering their rows in the proxy."""
+        rows = self._inverse[top_left.row() : bottom_right.row() + 1]
+        if len(rows) == 0:
+            return
+        self.dataChanged.emit(self.index(int(rows.min()), top_left.column()), self.index(int(rows.max()), bottom_right.column()), roles)
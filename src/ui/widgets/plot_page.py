@@ -0,0 +1,169 @@
+from pathlib import Path
+
+from PyQt6.QtCore import QBuffer, QByteArray, QCoreApplication, QIODevice, QObject, QUrl
+from PyQt6.QtWebEngineCore import QWebEnginePage, QWebEngineProfile, QWebEngineUrlRequestJob, QWebEngineUrlScheme, QWebEngineUrlSchemeHandler
+
+from src.backend.models.lru_cache import LruCache
+from src.utils.config import AppConfig
+
+# Scheme of the plot pages, served from memory by `PlotSchemeHandler`
+PLOT_SCHEME: bytes = b"plot"
+PLOT_HOST_URL: str = "plot:/host.html"
+# Number of figures kept by the scheme handler, more than the number of plot views
+FIGURE_STORE_SIZE: int = 32
+
+# Page hosting the plots: plotly.js is loaded once, figures are drawn by `renderFigure` with `Plotly.react`,
+# which only updates the changed parts of the DOM. `showFigure` fetches the figure JSON from the scheme first
+# and skips the figures superseded while they were being fetched
+PLOT_HOST_HTML: str = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<style type="text/css"> body { overflow:hidden; } </style>
+<script type="text/javascript">window.PlotlyConfig = {MathJaxConfig: 'local'};</script>
+<script charset="utf-8" src="plotly.min.js"></script>
+</head>
+<body>
+<div><div id="plot" class="plotly-graph-div" style="height:100%; width:100%;"></div></div>
+<script type="text/javascript">
+window.renderFigure = function (figure) {
+    return Plotly.react("plot", figure.data, figure.layout, {responsive: true});
+};
+let latestFigure = 0;
+window.showFigure = function (url) {
+    const request = ++latestFigure;
+    return fetch(url)
+        .then((response) => response.json())
+        .then((figure) => request === latestFigure ? renderFigure(figure) : null);
+};
+</script>
+</body>
+</html>
+"""
+
+# Caching of the responses: plotly.js and the figures (addressed by their content hash) never change within a session
+IMMUTABLE_HEADERS: dict[bytes, list[bytes]] = {b"Cache-Control": [b"public, max-age=31536000, immutable"]}
+NO_CACHE_HEADERS: dict[bytes, list[bytes]] = {b"Cache-Control": [b"no-cache"]}
+
+
+def register_plot_scheme() -> None:
+    """Registers the scheme of the plot pages, must be called before the application is created."""
+    scheme = QWebEngineUrlScheme(PLOT_SCHEME)
+    scheme.setSyntax(QWebEngineUrlScheme.Syntax.Path)
+    scheme.setFlags(
+        QWebEngineUrlScheme.Flag.SecureScheme
+        | QWebEngineUrlScheme.Flag.LocalAccessAllowed
+        | QWebEngineUrlScheme.Flag.CorsEnabled
+        | QWebEngineUrlScheme.Flag.FetchApiAllowed
+    )
+    QWebEngineUrlScheme.registerScheme(scheme)
+
+
+class PlotSchemeHandler(QWebEngineUrlSchemeHandler):
+    """
+    Serves the plot pages from memory: the host page, plotly.js (read from the resources once)
+    and the figure JSON stored by `add_figure` under `plot:/figures/<content hash>.json`.
+    Nothing is written to disk, so plots work from a read-only or network install folder.
+    """
+
+    def __init__(self, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self.plotlyjs: bytes | None = None
+        self.figures = LruCache(FIGURE_STORE_SIZE)
+
+    def add_figure(self, content_hash: str, plot_json: str) -> str:
+        """Stores the figure JSON, returns its URL."""
+        self.figures.put(content_hash, plot_json.encode("utf-8"))
+        return f"plot:/figures/{content_hash}.json"
+
+    def requestStarted(self, job: QWebEngineUrlRequestJob | None) -> None:  # noqa: N802
+        if job is None:
+            return
+        path = job.requestUrl().path()
+        if path == "/host.html":
+            self.reply(job, b"text/html", PLOT_HOST_HTML.encode("utf-8"), NO_CACHE_HEADERS)
+        elif path == "/plotly.min.js":
+            if self.plotlyjs is None:
+                self.plotlyjs = Path(AppConfig.get_resource_path("resources/plotly.min.js")).read_bytes()
+            self.reply(job, b"text/javascript", self.plotlyjs, IMMUTABLE_HEADERS)
+        elif path.startswith("/figures/") and (figure := self.figures.get(path.removeprefix("/figures/").removesuffix(".json"))) is not None:
+            self.reply(job, b"application/json", figure, IMMUTABLE_HEADERS)
+        else:
+            job.fail(QWebEngineUrlRequestJob.Error.UrlNotFound)
+
+    @staticmethod
+    def reply(job: QWebEngineUrlRequestJob, content_type: bytes, content: bytes, headers: dict[bytes, list[bytes]]) -> None:
+        # The buffer is owned by the job, it has to live until the job has read it
+        buffer = QBuffer(job)
+        buffer.setData(QByteArray(content))
+        buffer.open(QIODevice.OpenModeFlag.ReadOnly)
+        job.setAdditionalResponseHeaders({QByteArray(name): [QByteArray(value) for value in values] for name, values in headers.items()})
+        job.reply(content_type, buffer)
+
+
+class PlotPage(QWebEnginePage):
+    """
+    Persistent page of a plot view. The host page is loaded once, then every figure is fetched by `showFigure`.
+    A figure arriving before the page has loaded is drawn as soon as it has.
+    """
+
+    def __init__(self, profile: QWebEngineProfile, scheme_handler: PlotSchemeHandler, parent: QObject | None = None) -> None:
+        super().__init__(profile, parent)
+        self.scheme_handler = scheme_handler
+        self.ready = False
+        self.pending_figure: str | None = None
+        self.loadFinished.connect(self.on_load_finished)
+        self.load(QUrl(PLOT_HOST_URL))
+
+    def show_figure(self, plot_json: str, content_hash: str) -> None:
+        """Draws the figure given as plotly JSON (`{"data": [...], "layout": {...}}`) with its hash (see `figure_hash`)."""
+        url = self.scheme_handler.add_figure(content_hash, plot_json)
+        if not self.ready:
+            self.pending_figure = url
+            return
+        self.runJavaScript(f'showFigure("{url}");')
+
+    def on_load_finished(self, ok: bool) -> None:  # noqa: FBT001
+        self.ready = ok
+        if ok and self.pending_figure is not None:
+            url, self.pending_figure = self.pending_figure, None
+            self.runJavaScript(f'showFigure("{url}");')
+
+
+class PlotPagePool:
+    """
+    Pages with plotly.js already loaded, in one profile shared by all plot views.
+
+    `warm_up` is called at startup, before the workbook is parsed, so that the renderer process and plotly.js
+    start while the data is loading. Views borrow the pages with `acquire`, a new page is created if the pool is empty.
+    """
+
+    _shared: "PlotPagePool | None" = None
+
+    def __init__(self, size: int = 0) -> None:
+        # Off-the-record profile owned by the application, it must outlive the pages of all views
+        self.profile = QWebEngineProfile(QCoreApplication.instance())
+        self.scheme_handler = PlotSchemeHandler(self.profile)
+        self.profile.installUrlSchemeHandler(PLOT_SCHEME, self.scheme_handler)
+        self.pages: list[PlotPage] = [self.create_page() for _ in range(size)]
+
+    @classmethod
+    def shared(cls) -> "PlotPagePool":
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    @classmethod
+    def warm_up(cls, size: int) -> None:
+        """Adds pages to the shared pool until it holds `size` idle pages."""
+        pool = cls.shared()
+        pool.pages.extend(pool.create_page() for _ in range(size - len(pool.pages)))
+
+    def create_page(self) -> PlotPage:
+        return PlotPage(self.profile, self.scheme_handler)
+
+    def acquire(self, parent: QObject) -> PlotPage:
+        """Page for the view, owned by the view from now on."""
+        page = self.pages.pop(0) if self.pages else self.create_page()
+        page.setParent(parent)
+        return page
@@ -1,15 +1,27 @@
+import typing
+from collections.abc import Callable
+
 import pandas as pd
-import plotly.graph_objects as go
-from PyQt6.QtCore import QUrl, pyqtSignal
+from PyQt6.QtCore import pyqtSignal
 from PyQt6.QtWebEngineWidgets import QWebEngineView
 from PyQt6.QtWidgets import QWidget
 
+from src.backend.controllers.figure_controller import FigureTemplate, PlotStyle, cached_figure, figure_hash, figure_json
+from src.ui.widgets.plot_page import PlotPagePool
 from src.utils import utils
 from src.utils.config import AppConfig
 
+if typing.TYPE_CHECKING:
+    from src.backend.models.lru_cache import LruCache
+
+
+def default_colors() -> list[str]:
+    """Colors of the KPI values from the config: not met, met, empty."""
+    return [AppConfig.get_param("plot_red_color"), AppConfig.get_param("plot_green_color"), AppConfig.get_param("plot_gray_color")]
+
 
 class PlotWidget(QWebEngineView):
-    plot_updated = pyqtSignal(str, bool)
+    plot_updated = pyqtSignal(str, str, str, bool)  # name of the plot, figure JSON, its hash, is pie
 
     def __init__(
         self,
@@ -34,6 +46,11 @@ class PlotWidget(QWebEngineView):
         min_height: int = 600,
     ) -> None:
         super().__init__(parent=parent)
+        # Persistent page with plotly.js loaded, figures are drawn on it by `show_figure`
+        self.plot_page = PlotPagePool.shared().acquire(self)
+        self.setPage(self.plot_page)
+        # Hash of the figure on the page (see `figure_hash`)
+        self.shown_hash: str | None = None
 
         # Customizable properties
         self.name: str = name
@@ -57,6 +74,11 @@ class PlotWidget(QWebEngineView):
         # Data column names (default)
         self.column_names: list[str] = column_names or ["Нет в реестре", "Есть в реестре", "(пусто)"]
 
+        # Cache of generated figures, shared between the plots (see `make_plot`)
+        self.figure_cache: LruCache | None = None
+        # Skeletons of the figures in the current style, built on first use (see `figure_template`)
+        self.template: FigureTemplate | None = None
+
         # Set minimum size of widget
         self.setMinimumWidth(self.min_width)
         self.setMinimumHeight(self.min_height)
@@ -72,12 +94,13 @@ class PlotWidget(QWebEngineView):
         singular_title_template: str,
         legend_title: str,
         parent: QWidget | None = None,
+        colors: list[str] | None = None,
     ) -> "PlotWidget":
         """Alternative constructor that pulls default values from a config"""
         return cls(
             parent=parent,
             name=name,
-            colors=[AppConfig.get_param("plot_red_color"), AppConfig.get_param("plot_green_color"), AppConfig.get_param("plot_gray_color")],
+            colors=colors or default_colors(),
             tick_font_size=AppConfig.get_param("plot_tick_font_size"),
             legend_font_size=AppConfig.get_param("plot_legend_font_size"),
             title_font_size=AppConfig.get_param("plot_title_font_size"),
@@ -96,8 +119,9 @@ class PlotWidget(QWebEngineView):
             min_height=AppConfig.get_param("plot_min_height"),
         )
 
-    def reset_config(self) -> None:
-        self.colors = [AppConfig.get_param("plot_red_color"), AppConfig.get_param("plot_green_color"), AppConfig.get_param("plot_gray_color")]
+    def reset_config(self, colors: list[str] | None = None) -> None:
+        """Takes the style from the config, `colors` replace the default colors (see `from_config`) before the template is checked."""
+        self.colors = colors or default_colors()
         self.tick_font_size = AppConfig.get_param("plot_tick_font_size")
         self.legend_font_size = AppConfig.get_param("plot_legend_font_size")
         self.title_font_size = AppConfig.get_param("plot_title_font_size")
@@ -108,112 +132,45 @@ class PlotWidget(QWebEngineView):
         self.background_color = AppConfig.get_param("plot_background_color")
         self.min_width = AppConfig.get_param("plot_min_width")
         self.min_height = AppConfig.get_param("plot_min_height")
+        if self.template is not None and self.template.style.key() != self.plot_style().key():
+            self.template = None
+
+    def plot_style(self) -> PlotStyle:
+        return PlotStyle(
+            colors=self.colors,
+            tick_font_size=self.tick_font_size,
+            legend_font_size=self.legend_font_size,
+            title_font_size=self.title_font_size,
+            hover_font_size=self.hover_font_size,
+            text_info_font_size=self.text_info_font_size,
+            title_template=self.title_template,
+            x_axis_title=self.x_axis_title,
+            y_axis_title=self.y_axis_title,
+            column_names=self.column_names,
+            truncate_len=self.truncate_len,
+            singular_title_template=self.singular_title_template,
+            legend_title=self.legend_title,
+            margins=self.margins,
+            background_color=self.background_color,
+        )
 
-    def make_plot(self, data: pd.DataFrame, mask: pd.Series, width: int | None = None, height: int | None = None) -> tuple[go.Figure, bool]:
-        """Updates the plot based on the data and the provided mask."""
+    def make_plot(self, data: pd.DataFrame, mask: pd.Series, width: int | None = None, height: int | None = None) -> tuple[dict, bool]:
+        """
+        Updates the plot based on the data and the provided mask.
+        Figures of the tables carrying a cache key (see `KpiAggregator`) are memoized in `figure_cache`.
+        """
         if data is None:
-            return None, False
-
-        filtered_data: pd.DataFrame = data[mask]
-        truncated_index: pd.Series = filtered_data.index.to_series().apply(lambda x: x[: self.truncate_len] + "..." if len(x) > self.truncate_len else x)
-
-        fig: go.Figure = go.Figure()
-        is_pie = False
-
-        # Handle case where there's no data
-        if len(filtered_data) == 0:
-            is_pie = True
-            fig.add_annotation(text="Нет данных", xref="paper", yref="paper", x=0.5, y=0.5, showarrow=False, font={"size": 20}, align="center")
-            fig.update_layout(
-                showlegend=False,
-                xaxis={"showgrid": False, "showticklabels": False, "zeroline": False},
-                yaxis={"showgrid": False, "showticklabels": False, "zeroline": False},
-                margin=self.margins,
-                plot_bgcolor=self.background_color,
-            )
-        # Handle case where there's only one row
-        elif len(filtered_data) == 1:
-            is_pie = True
-            class_name: str = filtered_data.index[0]
-            pie_labels: list[str] = []
-            pie_values: list[float] = []
-            pie_colors: list[str] = []
-
-            for idx, name in enumerate(self.column_names):
-                filtered_data_value = filtered_data[name].to_list()[0]
-                if filtered_data_value != 0:
-                    pie_labels.append(name)
-                    pie_values.append(filtered_data_value)
-                    pie_colors.append(self.colors[idx])
-
-            # Add pie chart trace
-            fig.add_trace(
-                go.Pie(
-                    labels=pie_labels,
-                    values=pie_values,
-                    text=[f"{x:.1%}" for x in pie_values],
-                    textinfo="label+text",
-                    hoverinfo="label+text",
-                    textfont={"size": self.tick_font_size},
-                    hoverlabel={"font": {"size": self.hover_font_size}},
-                    marker={"colors": pie_colors},
-                )
-            )
-
-            # Update layout for pie chart
-            fig.update_layout(
-                title=self.singular_title_template.format(x=class_name),
-                title_font_size=self.title_font_size,
-                showlegend=True,
-                legend={"title": self.legend_title, "font": {"size": self.legend_font_size}},
-                margin=self.margins,
-                plot_bgcolor=self.background_color,
-            )
-        else:
-            for idx, name in enumerate(self.column_names):
-                fig.add_trace(
-                    go.Bar(
-                        x=filtered_data.index,
-                        y=filtered_data[name],
-                        name=name,
-                        marker_color=self.colors[idx],
-                        text=filtered_data[name].apply(lambda x: f"{x:.0%}"),
-                        hovertemplate="%{customdata}<br>" + name + ": %{text}<extra></extra>",
-                        hoverlabel={"font": {"size": self.hover_font_size}},
-                        textfont={"size": self.text_info_font_size},
-                        customdata=filtered_data.index,
-                    )
-                )
-
-            # Update layout for bar chart
-            fig.update_layout(
-                title=self.title_template,
-                title_font_size=self.title_font_size,
-                xaxis={
-                    "title": self.x_axis_title,
-                    "tickangle": -45,
-                    "tickmode": "array",
-                    "ticktext": truncated_index,
-                    "tickvals": filtered_data.index,
-                    "tickfont": {"size": self.tick_font_size},
-                },
-                yaxis={
-                    "title": self.y_axis_title,
-                    "range": [0, 1.1],
-                    "showticklabels": False,  # Hide the tick labels
-                    "showgrid": False,  # Hide the grid
-                    "zeroline": False,  # Hide the zero line
-                },
-                barmode="stack",
-                showlegend=True,
-                legend={"title": self.legend_title, "font": {"size": self.legend_font_size}},
-                margin=self.margins,
-                plot_bgcolor=self.background_color,
-                width=width,
-                height=height,
-            )
-
-        return fig, is_pie
+            return {}, False
+        return cached_figure(self.figure_template(), self.figure_cache, self.name, data, mask, width, height)
+
+    def figure_template(self) -> FigureTemplate:
+        """
+        Template of the figures in the current style, built on first use. Called in the GUI thread only:
+        the refresh and export threads get the template as a snapshot (see `cached_figure`).
+        """
+        if self.template is None:
+            self.template = FigureTemplate(self.plot_style())
+        return self.template
 
     def update_plot(self, data: pd.DataFrame, mask: pd.Series) -> None:
         """Updates the plot based on the data and the provided mask."""
@@ -221,17 +178,40 @@ class PlotWidget(QWebEngineView):
             return
 
         fig, is_pie = self.make_plot(data, mask)
-
-        # Save plot and load it in the widget
-        file: str = utils.create_plotly_plot(fig, self.name)
-        self.plot_updated.emit(file, is_pie)
-        self.load(QUrl.fromLocalFile(file))
+        plot_json = figure_json(fig)
+        self.show_figure(plot_json, figure_hash(plot_json), is_pie)
+
+    def show_figure(self, plot_json: str, content_hash: str, is_pie: bool) -> None:  # noqa: FBT001
+        """
+        Draws the figure (see `figure_json`) on the page of the widget, without reloading it.
+        The figure already shown is neither drawn again nor announced by `plot_updated`.
+        """
+        if content_hash == self.shown_hash:
+            return
+        self.shown_hash = content_hash
+        self.plot_page.show_figure(plot_json, content_hash)
+        self.plot_updated.emit(self.name, plot_json, content_hash, is_pie)
 
     def export_plot(self, data: pd.DataFrame, mask: pd.Series, file_path: str) -> None:
         if data is None:
             return
 
-        fig, _ = self.make_plot(data, mask, width=AppConfig.get_param("export_plot_width"), height=AppConfig.get_param("export_plot_height"))
+        fig = self.export_figure(data, mask)
 
         # Save plot and load it in the widget
         utils.export_plotly_plot(fig, file_path)
+
+    def export_figure(self, data: pd.DataFrame, mask: pd.Series) -> dict:
+        """Figure of the plot in the export size."""
+        return self.export_figure_task(data, mask)()
+
+    def export_figure_task(self, data: pd.DataFrame, mask: pd.Series) -> Callable[[], dict]:
+        """Builder of the figure of the plot in the export size, the style is taken now so that it can run outside of the GUI thread."""
+        template, figure_cache, name = self.figure_template(), self.figure_cache, self.name
+        width, height = AppConfig.get_param("export_plot_width"), AppConfig.get_param("export_plot_height")
+
+        def build() -> dict:
+            fig, _ = cached_figure(template, figure_cache, name, data, mask, width, height)
+            return fig
+
+        return build
@@ -0,0 +1,140 @@
+import math
+from typing import Any
+
+import numpy as np
+import pandas as pd
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, Qt, QVariant
+from PyQt6.QtWidgets import QAbstractItemView, QDialog, QHeaderView, QLabel, QTableView, QVBoxLayout, QWidget
+
+from src.utils.config import AppConfig
+
+# Number of rows formatted by one `fetchMore`
+FETCH_BATCH_SIZE: int = 500
+# Widths of the columns of the systems table, the other columns get the default width
+SYSTEM_COLUMN_WIDTHS: dict[str, int] = {"Инвентарный номер": 90, "Наименование": 300, "Краткое наименование": 200}
+DEFAULT_COLUMN_WIDTH: int = 160
+
+
+def display_value(value: Any) -> str:
+    """Text of a cell: empty for missing values, whole floats (e.g. numbers read from Excel) without the fraction."""
+    if value is None or (isinstance(value, float) and math.isnan(value)) or value is pd.NaT:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+class SystemsTableModel(QAbstractTableModel):
+    """
+    Systems of the dataset at the given positions, loaded incrementally.
+
+    The model keeps a reference to the dataset and the positions of its rows. Display strings are built
+    by `fetchMore` for the next batch of rows when the view scrolls to the end of the loaded ones,
+    so opening a selection of any size costs one batch and memory grows with the rows actually shown.
+    """
+
+    def __init__(self, data_df: pd.DataFrame, rows: np.ndarray, columns: list[str], batch_size: int = FETCH_BATCH_SIZE) -> None:
+        super().__init__()
+        self._data_df = data_df
+        self._rows = rows
+        self._columns = columns
+        self._positions = [data_df.columns.get_loc(column) for column in columns]
+        self._batch_size = batch_size
+        self._display: list[list[str]] = []  # Display strings of the loaded rows
+
+    def total_count(self) -> int:
+        return len(self._rows)
+
+    def rowCount(self, parent: QModelIndex | None = None) -> int:  # noqa: N802
+        if parent is not None and parent.isValid():
+            return 0
+        return len(self._display)
+
+    def columnCount(self, parent: QModelIndex | None = None) -> int:  # noqa: N802
+        if parent is not None and parent.isValid():
+            return 0
+        return len(self._columns)
+
+    def canFetchMore(self, parent: QModelIndex) -> bool:  # noqa: N802
+        return not parent.isValid() and len(self._display) < len(self._rows)
+
+    def fetchMore(self, parent: QModelIndex) -> None:  # noqa: N802
+        if parent.isValid():
+            return
+        first = len(self._display)
+        last = min(first + self._batch_size, len(self._rows))
+        if last <= first:
+            return
+
+        batch = self._data_df.iloc[self._rows[first:last], self._positions]
+        columns = [[display_value(value) for value in batch.iloc[:, i].tolist()] for i in range(len(self._columns))]
+        self.beginInsertRows(QModelIndex(), first, last - 1)
+        self._display.extend(map(list, zip(*columns, strict=True)))
+        self.endInsertRows()
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid():
+            return QVariant()
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.ToolTipRole):
+            return self._display[index.row()][index.column()]
+        return QVariant()
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.ItemDataRole.DisplayRole) -> Any:  # noqa: N802
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self._columns[section]
+        return QVariant()
+
+
+class SystemsTableView(QTableView):
+    """
+    Table of the systems with uniform row heights and fixed column widths,
+    so that the view never measures the contents of the rows (unlike `ResizeToContents`).
+    """
+
+    def __init__(self, parent: QWidget | None = None) -> None:
+        super().__init__(parent)
+        font = self.font()
+        font.setPointSize(AppConfig.get_param("font_size"))
+        self.setFont(font)
+        self.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.setWordWrap(False)
+
+        vertical_header = self.verticalHeader()
+        if vertical_header is not None:
+            vertical_header.setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+            vertical_header.setDefaultSectionSize(self.fontMetrics().height() + 8)
+            vertical_header.hide()
+
+        horizontal_header = self.horizontalHeader()
+        if horizontal_header is not None:
+            horizontal_header.setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+            horizontal_header.setDefaultSectionSize(DEFAULT_COLUMN_WIDTH)
+            horizontal_header.setDefaultAlignment(Qt.AlignmentFlag.AlignCenter | Qt.TextFlag.TextWordWrap)
+            horizontal_header.setMinimumHeight(60)
+            horizontal_header.setStretchLastSection(True)
+
+    def set_systems_model(self, model: SystemsTableModel, columns: list[str]) -> None:
+        self.setModel(model)
+        # The first batch right away, the view asks for the next ones while scrolling
+        model.fetchMore(QModelIndex())
+        for i, column in enumerate(columns):
+            self.setColumnWidth(i, SYSTEM_COLUMN_WIDTHS.get(column, DEFAULT_COLUMN_WIDTH))
+
+
+class SystemsWindow(QDialog):
+    """Drill-down window listing the systems behind a cell of a KPI table."""
+
+    def __init__(self, title: str, data_df: pd.DataFrame, rows: np.ndarray, columns: list[str], parent: QWidget | None = None) -> None:
+        super().__init__(parent)
+        self.setWindowTitle(title)
+        self.setWindowFlags(self.windowFlags() & ~Qt.WindowType.WindowContextHelpButtonHint)
+        self.resize(1200, 700)
+
+        self.model = SystemsTableModel(data_df, rows, columns)
+        self.label = QLabel(f"Кол-во систем: {self.model.total_count()}", self)
+        self.table = SystemsTableView(self)
+        self.table.set_systems_model(self.model, columns)
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(self.label)
+        layout.addWidget(self.table, stretch=1)
@@ -0,0 +1,73 @@
+import threading
+from pathlib import Path
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from src.backend.controllers.dashboard_controller import LoadCancelledError, load_data_sheet0
+from src.backend.controllers.kpi_controller import KpiAggregator
+from src.backend.models.data_cache import DataCache
+from src.backend.models.lru_cache import LruCache
+
+
+class DataLoader(QObject):
+    """
+    Parses the workbook, prepares the KPI aggregator and computes the initial tables of all tabs outside of the GUI thread.
+
+    The loader is meant to be moved to a QThread, `run` is connected to `QThread.started`.
+    Results are delivered only through signals, so connected widgets receive finished DataFrames in their own thread.
+    """
+
+    progress = pyqtSignal(int, str)  # stage number, stage description
+    loaded = pyqtSignal(object, object, object)  # parsed data, KpiAggregator, dict of KPI name -> table
+    failed = pyqtSignal(object)  # exception
+    cancelled = pyqtSignal()
+
+    stage_count: int = 3
+
+    def __init__(
+        self,
+        file_path: Path,
+        cache: DataCache | None = None,
+        result_cache: LruCache | None = None,
+        force_reparse: bool = False,  # noqa: FBT001, FBT002
+    ) -> None:
+        super().__init__()
+        self.file_path = file_path
+        self.cache = cache
+        self.result_cache = result_cache
+        self.force_reparse = force_reparse
+        self._cancel_event = threading.Event()
+
+    def cancel(self) -> None:
+        """Requests cancellation. Safe to call from any thread."""
+        self._cancel_event.set()
+
+    def is_cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def check_cancelled(self) -> None:
+        if self.is_cancelled():
+            raise LoadCancelledError
+
+    def run(self) -> None:
+        try:
+            self.progress.emit(0, "Чтение файла")
+            data = load_data_sheet0(self.file_path, self.cache, force_reparse=self.force_reparse, is_cancelled=self.is_cancelled)
+
+            self.check_cancelled()
+            self.progress.emit(1, "Подготовка данных")
+            aggregator = KpiAggregator(data, self.result_cache)
+
+            self.check_cancelled()
+            self.progress.emit(2, "Расчёт показателей")
+            tables = aggregator.aggregate()
+
+        except LoadCancelledError:
+            self.cancelled.emit()
+
+        except Exception as e:  # noqa: BLE001
+            self.failed.emit(e)
+
+        else:
+            self.progress.emit(self.stage_count, "Готово")
+            self.loaded.emit(data, aggregator, tables)
@@ -0,0 +1,39 @@
+from pathlib import Path
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from src.backend.controllers.export_controller import ExportTask, ImageExporter, export_all
+
+
+class ExportWorker(QObject):
+    """
+    Exports the charts of all tabs (see `export_all`) outside of the GUI thread.
+
+    The worker is meant to be moved to a QThread, `run` is connected to `QThread.started`.
+    """
+
+    progress = pyqtSignal(int, str)  # number of written files, name of the last one
+    finished = pyqtSignal(object)  # list of the written files
+    failed = pyqtSignal(object)  # exception
+
+    def __init__(self, tasks: list[ExportTask], output_dir: Path, exporter: ImageExporter) -> None:
+        super().__init__()
+        self.tasks = tasks
+        self.output_dir = output_dir
+        self.exporter = exporter
+        self.done_count = 0
+
+    def file_count(self) -> int:
+        return sum(task.file_count() for task in self.tasks)
+
+    def on_file_done(self, file_path: Path) -> None:
+        self.done_count += 1
+        self.progress.emit(self.done_count, file_path.name)
+
+    def run(self) -> None:
+        try:
+            files = export_all(self.tasks, self.output_dir, self.exporter, self.on_file_done)
+        except Exception as e:  # noqa: BLE001
+            self.failed.emit(e)
+        else:
+            self.finished.emit(files)
@@ -0,0 +1,86 @@
+from collections.abc import Callable
+from typing import Any
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+
+class RefreshCancelledError(Exception):
+    """Raised by a refresh task when a newer refresh superseded it."""
+
+
+class RefreshJob(QRunnable):
+    """One refresh task run on the thread pool, tagged with the generation of its scheduler at submission."""
+
+    def __init__(self, scheduler: "RefreshScheduler", generation: int, task: Callable[[Callable[[], bool]], Any]) -> None:
+        super().__init__()
+        # The scheduler keeps the job to be able to take it back from the pool queue
+        self.setAutoDelete(False)
+        self.scheduler = scheduler
+        self.generation = generation
+        self.task = task
+
+    def is_cancelled(self) -> bool:
+        return self.generation != self.scheduler.generation
+
+    def run(self) -> None:
+        try:
+            if self.is_cancelled():
+                raise RefreshCancelledError  # noqa: TRY301
+            result = self.task(self.is_cancelled)
+        except Exception as e:  # noqa: BLE001
+            self.scheduler.job_done.emit(self.generation, None, e)
+        else:
+            self.scheduler.job_done.emit(self.generation, result, None)
+
+
+class RefreshScheduler(QObject):
+    """
+    Runs the refresh tasks of a widget on a thread pool, newest first.
+
+    Every submitted task gets the next generation number. A new task supersedes the older ones:
+    the queued ones are taken back from the pool, the running ones see `is_cancelled()` become true,
+    and results of any outdated generation are dropped before `finished` is emitted.
+    Signals are delivered in the thread of the scheduler (the GUI thread).
+    """
+
+    finished = pyqtSignal(object)  # result of the latest task
+    failed = pyqtSignal(object)  # exception of the latest task
+    job_done = pyqtSignal(int, object, object)  # generation, result, exception; emitted in the pool thread
+
+    def __init__(self, parent: QObject | None = None, pool: QThreadPool | None = None) -> None:
+        super().__init__(parent)
+        self.pool = pool or QThreadPool.globalInstance()
+        self.generation = 0
+        self.jobs: dict[int, RefreshJob] = {}
+        self.job_done.connect(self.on_job_done)
+
+    def submit(self, task: Callable[[Callable[[], bool]], Any]) -> int:
+        """
+        Starts the task, it is called in a pool thread with a function telling whether the task was superseded.
+        Returns the generation of the task.
+        """
+        self.cancel()
+        job = RefreshJob(self, self.generation, task)
+        self.jobs[job.generation] = job
+        if self.pool is not None:
+            self.pool.start(job)
+        return job.generation
+
+    def cancel(self) -> None:
+        """Supersedes all submitted tasks."""
+        self.generation += 1
+        for job in list(self.jobs.values()):
+            if self.pool is not None and self.pool.tryTake(job):
+                del self.jobs[job.generation]
+
+    def is_busy(self) -> bool:
+        return self.generation in self.jobs
+
+    def on_job_done(self, generation: int, result: Any, error: Exception | None) -> None:
+        self.jobs.pop(generation, None)
+        if generation != self.generation or isinstance(error, RefreshCancelledError):
+            return
+        if error is not None:
+            self.failed.emit(error)
+        else:
+            self.finished.emit(result)
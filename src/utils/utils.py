@@ -3,13 +3,10 @@ from datetime import date, datetime
 from pathlib import Path
 from typing import Any
 
-import pandas as pd
-import plotly
 import plotly.graph_objects as go
+import plotly.io as pio
 from PyQt6.QtWidgets import QMessageBox
 
-from src.utils.config import AppConfig
-
 
 def deep_print(current_obj: Any, max_depth: int = 3, name: str = "init", current_level: int = 0) -> None:
     if current_level > max_depth:
@@ -70,38 +67,9 @@ def quarter_to_date_range(year: int, quarter: int) -> tuple[date, date]:
     )
 
 
-def format_percent(df: pd.DataFrame, exclude: list[str] | None = None) -> pd.DataFrame:
-    if exclude is None:
-        exclude = []
-    new_df = df.copy()
-    for col in df.columns:
-        if col not in exclude:
-            new_df[col] = new_df[col].apply("{:.0%}".format)
-    return new_df
-
-
-def create_plotly_plot(fig: go.Figure, file_name: str) -> str:
-    plotlyjs = AppConfig.get_resource_path("resources/plotly.min.js")
-    html_folder = Path(AppConfig.get_some_path("html"))
-    if not html_folder.exists():
-        html_folder.mkdir()
-    file = AppConfig.get_some_path(f"html/{file_name}.html")
-    # Display the plot
-    html = (
-        '<style type="text/css"> body { overflow:hidden; } </style>'
-        "<script type=\"text/javascript\">window.PlotlyConfig = {MathJaxConfig: 'local'};</script>"
-        f'<script charset="utf-8" src="{plotlyjs}"></script>'
-    )
-    html += plotly.offline.plot(fig, include_plotlyjs=False, auto_open=False, output_type="div")
-    with Path(file).open("w") as f:
-        f.write(html)
-
-    return file
-
-
-def export_plotly_plot(fig: go.Figure, file_name: str) -> None:
-    """Export plotly plot to png file."""
-    fig.write_image(file_name, format="png")
+def export_plotly_plot(fig: go.Figure | dict, file_name: str) -> None:
+    """Export plotly plot (a figure or a figure dict) to png file."""
+    pio.write_image(fig, file_name, format="png")
 
 
 def show_error_dialog(title: str, message: str) -> None: